@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Edit decision list export and ffmpeg cutting for the keep ranges.
+
+Cutting re-encodes as little as possible: the part of a range between its
+first and last keyframe is stream-copied, and only the partial GOPs before
+the first and after the last keyframe are re-encoded. The pieces are then
+joined without another re-encode, so a video takes seconds instead of a
+full real-time encode. The edges are encoded in the source's codec, pixel
+format and sample rate; a source that can't be matched is re-encoded in full.
+"""
+
+import os
+import re
+import glob
+import time
+import shutil
+import functools
+import tempfile
+import subprocess
+
+FFMPEG = 'ffmpeg'
+EDL_FPS = 25  # Keep ranges are whole seconds, so the frame rate only sets the timecode format
+KEYFRAME_TOLERANCE = 0.1  # Cut points this close to a keyframe snap to it instead of re-encoding
+DURATION_TOLERANCE = 0.1  # Warn when a cut video is off by more than this many seconds
+# Encoders for the re-encoded edges by source codec, so they join the copied pieces cleanly
+EDGE_VIDEO_ENCODERS = {
+    'h264': ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '18'],
+    'hevc': ['-c:v', 'libx265', '-preset', 'veryfast', '-crf', '20', '-x265-params', 'log-level=error'],
+}
+EDGE_AUDIO_ENCODERS = {'aac': ['-c:a', 'aac']}
+# Full re-encode for sources the edge encoders can't match
+ENCODE_ARGS = ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '18', '-pix_fmt', 'yuv420p', '-c:a', 'aac']
+
+def timecode(seconds, fps=EDL_FPS):
+    """Format seconds as an HH:MM:SS:FF timecode."""
+    frames = round(seconds * fps)
+    return f"{frames // (3600 * fps):02d}:{frames // (60 * fps) % 60:02d}:{frames // fps % 60:02d}:{frames % fps:02d}"
+
+def write_edl(ranges, output_path, title='Dance edit', fps=EDL_FPS):
+    """Save the keep ranges of every video as a CMX 3600 EDL, placed back to back on the record side.
+
+    ranges is {video: {'keep': [(start, end), ...], ...}} as returned by
+    PreferenceIntervals.keep_cut_ranges; the video ID is used as the reel name.
+    Returns the number of events.
+    """
+    lines = [f'TITLE: {title}', 'FCM: NON-DROP FRAME', '']
+    record = 0
+    event = 0
+    for video in sorted(ranges):
+        for start, end in ranges[video]['keep']:
+            event += 1
+            lines.append(f"{event:03d}  {video:<8} AA/V  C        {timecode(start, fps)} {timecode(end, fps)} "
+                         f"{timecode(record, fps)} {timecode(record + end - start, fps)}")
+            lines.append(f"* FROM CLIP NAME: {video}")
+            lines.append('')
+            record += end - start
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+    return event
+
+def run_ffmpeg(args):
+    subprocess.run([FFMPEG, '-hide_banner', '-v', 'error', '-y'] + args, check=True)
+
+def scan_packets(path):
+    """Video packets of the first video stream in decode order, as (pts, duration, keyframe) in seconds.
+
+    Reads the packet list without decoding anything (ffmpeg's framecrc
+    output), so it takes a fraction of a second even for long videos.
+    Times are relative to the start of the file, like -ss.
+    """
+    result = subprocess.run([FFMPEG, '-hide_banner', '-v', 'error', '-i', path,
+                             '-map', '0:v:0', '-c', 'copy', '-f', 'framecrc', '-'],
+                            capture_output=True, text=True, check=True)
+    num, den = map(int, re.search(r'^#tb 0: (\d+)/(\d+)', result.stdout, re.M).groups())
+    packets = []
+    for line in result.stdout.splitlines():
+        if line.startswith('#'):
+            continue
+        fields = [field.strip() for field in line.split(',')]
+        flags = int(fields[6][2:], 16) if len(fields) > 6 else 1  # The flags are left out for keyframes
+        packets.append((int(fields[2]), int(fields[3]), flags & 1))
+    if not packets:
+        return []
+    start = min(pts for pts, _, _ in packets)
+    return [((pts - start) * num / den, duration * num / den, bool(key)) for pts, duration, key in packets]
+
+def find_keyframes(path):
+    """({keyframe time: packet number in decode order}, sorted frame times) of the first video stream."""
+    packets = scan_packets(path)
+    keyframes = {pts: index for index, (pts, _, key) in enumerate(packets) if key}
+    return keyframes, sorted(pts for pts, _, _ in packets)
+
+def probe_streams(path):
+    """Codec details of the first video and audio stream, from ffmpeg's input summary.
+
+    Returns {'video': codec, 'pix_fmt': ..., 'audio': codec, 'sample_rate': Hz};
+    the values are None for a stream the file doesn't have.
+    """
+    # Without an output ffmpeg only prints the summary (and exits with an error)
+    result = subprocess.run([FFMPEG, '-hide_banner', '-i', path], capture_output=True, text=True)
+    video = re.search(r'^\s*Stream #.*?: Video: (\w+)[^,]*, (\w+)', result.stderr, re.M)
+    audio = re.search(r'^\s*Stream #.*?: Audio: (\w+)[^,]*, (\d+) Hz', result.stderr, re.M)
+    return {'video': video and video.group(1), 'pix_fmt': video and video.group(2),
+            'audio': audio and audio.group(1), 'sample_rate': audio and audio.group(2)}
+
+@functools.lru_cache(maxsize=None)
+def encoder_pix_fmts(encoder):
+    """Pixel formats an ffmpeg encoder supports; empty if this ffmpeg doesn't have it."""
+    result = subprocess.run([FFMPEG, '-hide_banner', '-h', f'encoder={encoder}'], capture_output=True, text=True)
+    match = re.search(r'Supported pixel formats: (.*)', result.stdout)
+    return frozenset(match.group(1).split()) if match else frozenset()
+
+def edge_encode_args(streams):
+    """Encoder args that re-encode edges in the source's format, or None if they can't match it.
+
+    The pieces are joined without re-encoding, so the edges must have the same
+    codec, pixel format (bit depth, chroma subsampling) and sample rate as the
+    stream-copied part.
+    """
+    video = EDGE_VIDEO_ENCODERS.get(streams['video'])
+    if video is None or streams['pix_fmt'] not in encoder_pix_fmts(video[1]):
+        return None
+    args = video + ['-pix_fmt', streams['pix_fmt']]
+    if streams['audio'] is None:
+        return args
+    audio = EDGE_AUDIO_ENCODERS.get(streams['audio'])
+    if audio is None:
+        return None
+    return args + audio + ['-ar', streams['sample_rate']]
+
+def video_duration(path):
+    """Length of the first video stream in seconds, from its packets."""
+    packets = scan_packets(path)
+    return max((pts + duration for pts, duration, _ in packets), default=0)
+
+def plan_segments(start, end, keyframes, tolerance=KEYFRAME_TOLERANCE):
+    """Split [start, end) into ('copy' or 'encode', start, end) pieces.
+
+    Everything from the first keyframe at the start (or after it) to the last
+    keyframe at the end (or before it) is copied; the rest is re-encoded.
+    A cut point within tolerance of a keyframe snaps to it, so it needs no
+    re-encoded edge at all.
+    """
+    first = next((k for k in keyframes if k >= start - tolerance), None)
+    last = next((k for k in reversed(keyframes) if k <= end + tolerance), None)
+    if first is None or last is None or last <= first:
+        # No whole GOP inside the range
+        return [('encode', start, end)]
+
+    segments = []
+    if first - start > tolerance:
+        segments.append(('encode', start, first))
+    segments.append(('copy', first, last))
+    if end - last > tolerance:
+        segments.append(('encode', last, end))
+    return segments
+
+def cut_video(source, keep, output_path, edge_args=None):
+    """Join the keep ranges of one video into output_path; returns (seconds copied, seconds re-encoded).
+
+    edge_args are the encoder args for the edges (edge_encode_args); without
+    them every range is re-encoded in full with ENCODE_ARGS.
+    """
+    keyframes, frame_times = find_keyframes(source)
+    keyframe_times = sorted(keyframes)
+    # -ss only keeps microseconds, and a keyframe time rounded the wrong way would
+    # seek to the previous GOP (copy) or take the keyframe twice (encode), so cut
+    # points on a keyframe are moved half a frame to the safe side
+    gaps = [b - a for a, b in zip(frame_times, frame_times[1:]) if b > a]
+    half_frame = min(gaps) / 2 if gaps else 0
+    workdir = tempfile.mkdtemp(prefix='cuts_', dir=os.path.dirname(output_path) or '.')
+    pieces = []
+    seconds = {'copy': 0.0, 'encode': 0.0}
+    try:
+        for start, end in keep:
+            segments = plan_segments(start, end, keyframe_times) if edge_args else [('encode', start, end)]
+            for mode, piece_start, piece_end in segments:
+                # MPEG-TS pieces carry their codec headers in-band, so copied and
+                # re-encoded pieces can be concatenated without re-encoding
+                piece = os.path.join(workdir, f'{len(pieces):04d}.ts')
+                # Video is limited by frame count rather than by time: a time limit goes by
+                # decode order when copying (taking the closing keyframe along) and isn't
+                # frame-exact when encoding
+                if mode == 'copy':
+                    # Copy seeks land on the keyframe at or before -ss
+                    seek = piece_start + half_frame
+                    frames = keyframes[piece_end] - keyframes[piece_start]
+                    codec = ['-c', 'copy', '-t', f'{piece_end - piece_start:.6f}', '-avoid_negative_ts', 'make_zero']
+                else:
+                    # Encoded pieces start at the first frame at or after -ss
+                    seek = round(piece_start - half_frame if piece_start in keyframes else piece_start, 6)
+                    stop = piece_end - half_frame if piece_end in keyframes else piece_end
+                    frames = sum(1 for t in frame_times if seek <= t < stop)
+                    codec = ['-af', f'atrim=duration={piece_end - seek:.6f}'] + (edge_args or ENCODE_ARGS)
+                run_ffmpeg(['-ss', f'{seek:.6f}', '-i', source, '-map', '0:v:0', '-map', '0:a?',
+                            '-frames:v', str(frames)] + codec + [piece])
+                pieces.append(piece)
+                seconds[mode] += piece_end - piece_start
+
+        list_path = os.path.join(workdir, 'pieces.txt')
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for piece in pieces:
+                f.write(f"file '{os.path.abspath(piece)}'\n")
+        run_ffmpeg(['-f', 'concat', '-safe', '0', '-i', list_path, '-c', 'copy', output_path])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return seconds['copy'], seconds['encode']
+
+def find_source(video_dir, video):
+    """The source file for a video ID, e.g. videos/A005.mp4, or None."""
+    matches = sorted(glob.glob(os.path.join(video_dir, f'{video}.*')))
+    return matches[0] if matches else None
+
+def cut_videos(ranges, video_dir, output_dir):
+    """Cut every video with keep ranges into output_dir/<video>_edit.<ext>."""
+    if shutil.which(FFMPEG) is None:
+        print(f"Warning: '{FFMPEG}' not found, skipping the video cuts")
+        return
+    os.makedirs(output_dir, exist_ok=True)
+
+    for video in sorted(ranges):
+        keep = ranges[video]['keep']
+        if not keep:
+            print(f"  {video}: nothing to keep")
+            continue
+        source = find_source(video_dir, video)
+        if source is None:
+            print(f"Warning: no source file for {video} in '{video_dir}'")
+            continue
+
+        extension = os.path.splitext(source)[1]
+        streams = probe_streams(source)
+        edge_args = edge_encode_args(streams)
+        if edge_args is None:
+            print(f"Warning: can't match {streams['video']}/{streams['pix_fmt']} "
+                  f"{streams['audio']}/{streams['sample_rate']} Hz in {source}, re-encoding it in full")
+            extension = '.mp4'  # ENCODE_ARGS is H.264/AAC, which e.g. WebM can't hold
+        output_path = os.path.join(output_dir, f'{video}_edit{extension}')
+        start = time.perf_counter()
+        try:
+            copied, encoded = cut_video(source, keep, output_path, edge_args)
+            duration = video_duration(output_path)
+        except subprocess.CalledProcessError as e:
+            print(f"Warning: ffmpeg failed on {source}: {e}")
+            continue
+        print(f"  {video}: {len(keep)} ranges, {copied:.1f}s copied, {encoded:.1f}s re-encoded "
+              f"in {time.perf_counter() - start:.2f}s -> '{output_path}'")
+        if abs(duration - (copied + encoded)) > DURATION_TOLERANCE:
+            print(f"Warning: '{output_path}' is {duration:.2f}s long, expected {copied + encoded:.2f}s")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Wait for changes to files in a folder.
+
+Uses Linux inotify through ctypes (no extra dependency) and falls back to
+polling mtimes elsewhere, or where inotify doesn't see edits (e.g. Windows
+drives mounted in WSL). Bursts of events, like an editor's save, are
+debounced into one change set.
+"""
+
+import os
+import sys
+import time
+import ctypes
+import select
+import struct
+import fnmatch
+
+# inotify event flags (from <sys/inotify.h>)
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+def open_inotify(directory):
+    """Return an inotify file descriptor watching directory, or None if inotify is unavailable."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+def read_events(fd):
+    """Names of the files in all pending inotify events."""
+    names = set()
+    while True:
+        try:
+            data = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        pos = 0
+        while pos < len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, pos)
+            start = pos + EVENT_HEADER.size
+            names.add(os.fsdecode(data[start:start + length].rstrip(b'\0')))
+            pos = start + length
+
+def snapshot(directory, pattern):
+    """{name: (mtime_ns, size)} of the matching files in directory."""
+    state = {}
+    for entry in os.scandir(directory):
+        if entry.is_file() and fnmatch.fnmatch(entry.name, pattern):
+            stat = entry.stat()
+            state[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+def watch_changes(directory, pattern='*.txt', debounce=0.15, poll_interval=1.0, use_inotify=True):
+    """Yield the set of changed file names each time directory settles after a change.
+
+    A change set is only yielded once no new event arrived for `debounce`
+    seconds, so a burst of writes produces a single update.
+    """
+    fd = open_inotify(directory) if use_inotify else None
+    if fd is None:
+        print(f"Polling '{directory}' every {poll_interval}s for changes")
+        yield from _poll_changes(directory, pattern, debounce, poll_interval)
+        return
+
+    print(f"Watching '{directory}' for changes")
+    try:
+        while True:
+            select.select([fd], [], [])
+            changed = read_events(fd)
+            while select.select([fd], [], [], debounce)[0]:
+                changed |= read_events(fd)
+            changed = {name for name in changed if fnmatch.fnmatch(name, pattern)}
+            if changed:
+                yield changed
+    finally:
+        os.close(fd)
+
+def _poll_changes(directory, pattern, debounce, poll_interval):
+    last = snapshot(directory, pattern)
+    pending = set()
+    last_change = 0.0
+    while True:
+        time.sleep(poll_interval)
+        current = snapshot(directory, pattern)
+        changed = {name for name in set(last) | set(current) if last.get(name) != current.get(name)}
+        last = current
+        if changed:
+            pending |= changed
+            last_change = time.monotonic()
+        elif pending and time.monotonic() - last_change >= debounce:
+            yield pending
+            pending = set()
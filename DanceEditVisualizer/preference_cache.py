@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Persisted cache for parsed preference files and rendered images.
+
+Each input file is remembered by path with its mtime, size and content hash,
+so a run only re-parses files that actually changed. Rendered images are
+remembered by a key built from every input hash plus the render settings,
+so an unchanged set of inputs reuses the existing image.
+"""
+
+import os
+import json
+import hashlib
+
+CACHE_FILE = os.path.join('output', '.preference_cache.json')
+
+def file_hash(path):
+    """SHA-1 of a file's contents."""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+class PreferenceCache:
+    """Parsed preference files and rendered outputs, stored in one JSON file."""
+
+    def __init__(self, cache_file=CACHE_FILE):
+        self.cache_file = cache_file
+        self.files = {}
+        self.renders = {}
+        self.dirty = False
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.files = data.get('files', {})
+                self.renders = data.get('renders', {})
+            except (OSError, ValueError):
+                print(f"Warning: cache {cache_file} unreadable, rebuilding")
+
+    def load(self, path, parse):
+        """Return (preferences, text, hash) for a preference file, calling parse(path) only if it changed."""
+        stat = os.stat(path)
+        entry = self.files.get(path)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return self._result(entry)
+
+        digest = file_hash(path)
+        if entry and entry['hash'] == digest:
+            # Touched but not edited
+            entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            entry = {
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'hash': digest,
+                'text': text,
+                'preferences': parse(path),
+            }
+            print(f"Parsed {path}")
+        self.files[path] = entry
+        self.dirty = True
+        return self._result(entry)
+
+    @staticmethod
+    def _result(entry):
+        preferences = {video: [tuple(r) for r in ranges] for video, ranges in entry['preferences'].items()}
+        return preferences, entry['text'], entry['hash']
+
+    def prune(self, keep):
+        """Forget files that are no longer inputs."""
+        for path in [p for p in self.files if p not in keep]:
+            del self.files[path]
+            self.dirty = True
+
+    @staticmethod
+    def render_key(hashes, settings):
+        """Key for a rendered image: every input hash plus the settings that affect the drawing."""
+        payload = json.dumps({'inputs': hashes, 'settings': settings}, sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def get_render(self, key):
+        """Path of an earlier render with this key, if the file still exists."""
+        path = self.renders.get(key)
+        return path if path and os.path.exists(path) else None
+
+    def put_render(self, key, path):
+        self.renders[key] = path
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+        tmp_path = self.cache_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.files, 'renders': self.renders}, f, indent=1, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_file)
+        self.dirty = False
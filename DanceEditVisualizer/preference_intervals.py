@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Interval engine for dance edit preferences.
+
+All parsed time ranges are held in flat NumPy arrays (start, end, person,
+video, kind), so coverage and consensus for every second of every video
+come from a couple of bincount/cumsum sweeps instead of Python loops.
+"""
+
+import json
+import numpy as np
+
+KINDS = ('want', 'nowant')
+
+def format_time(seconds):
+    """Format seconds as M:SS."""
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+def mask_to_ranges(mask):
+    """Turn a per-second boolean mask into merged (start, end) ranges, end exclusive."""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return [(int(start), int(end)) for start, end in zip(edges[::2], edges[1::2])]
+
+class PreferenceIntervals:
+    """Every preference range, indexed by (person, video, want/nowant).
+
+    all_preferences is the parsed structure used by the visualizer:
+    {person: {'want'/'nowant': {video: [(start_sec, end_sec), ...]}}}.
+    Ranges are treated as [start, end) in whole seconds and clipped to the
+    video duration; videos not in `videos` are ignored.
+    """
+
+    def __init__(self, all_preferences, videos, duration):
+        self.people = list(all_preferences)
+        self.videos = list(videos)
+        self.duration = duration
+        video_index = {video: i for i, video in enumerate(self.videos)}
+
+        rows = []
+        for p, person_name in enumerate(self.people):
+            for k, kind in enumerate(KINDS):
+                for video, ranges in all_preferences[person_name].get(kind, {}).items():
+                    if video not in video_index:
+                        continue
+                    for start_sec, end_sec in ranges:
+                        rows.append((p, video_index[video], k, start_sec, end_sec))
+        data = np.array(rows, dtype=np.int64).reshape(-1, 5)
+        self.person, self.video, self.kind = data[:, 0], data[:, 1], data[:, 2]
+        self.starts = np.clip(data[:, 3], 0, duration)
+        self.ends = np.clip(data[:, 4], 0, duration)
+        self._covered = None
+
+    def __len__(self):
+        return len(self.starts)
+
+    def covered(self):
+        """Boolean array (kind, person, video, second): does that person's range cover that second.
+
+        One sweep for everything: +1 at each start and -1 at each end are
+        bincounted into a flat timeline per (kind, person, video), then a
+        cumulative sum gives how many of that person's ranges are active.
+        Overlapping ranges from the same person therefore count once.
+        """
+        if self._covered is None:
+            shape = (len(KINDS), len(self.people), len(self.videos), self.duration + 1)
+            valid = self.ends > self.starts
+            base = ((self.kind * shape[1] + self.person) * shape[2] + self.video) * shape[3]
+            size = int(np.prod(shape))
+            delta = (np.bincount(base[valid] + self.starts[valid], minlength=size)
+                     - np.bincount(base[valid] + self.ends[valid], minlength=size))
+            self._covered = np.cumsum(delta.reshape(shape), axis=-1)[..., :-1] > 0
+        return self._covered
+
+    def coverage(self, kind):
+        """Array (video, second): how many people marked each second as `kind`."""
+        return self.covered()[KINDS.index(kind)].sum(axis=0)
+
+    def consensus(self, min_want=1, max_nowant=0):
+        """Boolean array (video, second): wanted by >= min_want people and unwanted by <= max_nowant."""
+        return (self.coverage('want') >= min_want) & (self.coverage('nowant') <= max_nowant)
+
+    def keep_cut_ranges(self, min_want=1, max_nowant=0):
+        """Merged keep and cut ranges per video for the given consensus rule."""
+        keep = self.consensus(min_want, max_nowant)
+        return {
+            video: {'keep': mask_to_ranges(keep[i]), 'cut': mask_to_ranges(~keep[i])}
+            for i, video in enumerate(self.videos)
+        }
+
+def export_ranges(ranges, output_path, rule=None):
+    """Save keep/cut ranges as JSON (seconds plus M:SS labels)."""
+    data = {'rule': rule or {}, 'videos': {}}
+    for video, parts in ranges.items():
+        data['videos'][video] = {
+            part: [{'start': start, 'end': end, 'label': f"{format_time(start)}-{format_time(end)}"}
+                   for start, end in spans]
+            for part, spans in parts.items()
+        }
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
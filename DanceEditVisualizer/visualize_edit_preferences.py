@@ -10,10 +10,30 @@ import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend for WSL compatibility
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import PatchCollection
+from matplotlib.layout_engine import TightLayoutEngine
 import numpy as np
 from datetime import datetime, timedelta
 import os
 import glob
+import time
+import argparse
+from multiprocessing import Pool
+from preference_intervals import PreferenceIntervals, KINDS, export_ranges, format_time
+from preference_cache import PreferenceCache, file_hash
+from file_watch import watch_changes
+from edit_cuts import write_edl, cut_videos
+
+# Video information
+VIDEOS = ['A019', 'A011', 'A005']  # A005 (top), A011 (middle), A019 (bottom)
+VIDEO_DURATION = 3 * 60 + 30  # 3:30 minutes in seconds
+RENDER_VERSION = 1  # Bump when the drawing changes, so cached images are not reused
+WATCH_OUTPUT = os.path.join('output', 'edit_preferences_live.png')  # Overwritten on every change in watch mode
+WATCH_DPI = 100  # Lower than the export so each refresh stays well under a second
+WATCH_DEBOUNCE = 0.15
+EXPORT_DETAIL_DPI = 200
+EXPORT_THUMBNAIL_DPI = 30
+CHART_TITLE = 'Dance Video Edit Preferences\n(Green = wanted parts, Red = unwanted parts)'
 
 def parse_time_range(time_str):
     """Parse time range string like '00:49-00:53' into start and end seconds."""
@@ -58,13 +78,13 @@ def parse_preference_file(filename):
     
     return preferences
 
-def get_next_output_number(output_dir):
-    """Get the next available output number for the output file."""
+def get_next_output_number(output_dir, pattern='edit_preferences_visualization_*.png'):
+    """Get the next available output number for the output file (or folder) matching pattern."""
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
         return 1
     
-    existing_files = glob.glob(os.path.join(output_dir, 'edit_preferences_visualization_*.png'))
+    existing_files = glob.glob(os.path.join(output_dir, pattern))
     if not existing_files:
         return 1
     
@@ -74,7 +94,7 @@ def get_next_output_number(output_dir):
         try:
             # Extract number from filename like "edit_preferences_visualization_01.png"
             filename = os.path.basename(file)
-            number_str = filename.split('_')[-1].replace('.png', '')
+            number_str = os.path.splitext(filename)[0].split('_')[-1]
             numbers.append(int(number_str))
         except (ValueError, IndexError):
             continue
@@ -85,7 +105,7 @@ def get_preference_files(input_dir):
     """Get all preference files from the input directory and group them by person."""
     if not os.path.exists(input_dir):
         print(f"Warning: Input directory '{input_dir}' not found")
-        return {}
+        return {}, {}
     
     # Get all .txt files in the input directory
     txt_files = glob.glob(os.path.join(input_dir, '*.txt'))
@@ -120,6 +140,36 @@ def get_preference_files(input_dir):
     
     return people_preferences, person_colors
 
+def load_dataset(input_dir='input', cache=None):
+    """Read and parse every preference file once, for the summary, the chart and the consensus.
+    
+    Returns a dict with 'people_preferences' (file paths), 'all_preferences'
+    ({person: {pref_type: {video: [(start, end), ...]}}}), and the raw
+    'texts' and content 'hashes' of each file. With a PreferenceCache, only
+    files that changed since the last run are parsed again.
+    """
+    people_preferences, _ = get_preference_files(input_dir)
+    data = {'people_preferences': people_preferences, 'all_preferences': {}, 'texts': {}, 'hashes': {}}
+    
+    for person_name, prefs in people_preferences.items():
+        for key in ('all_preferences', 'texts', 'hashes'):
+            data[key][person_name] = {}
+        for pref_type, file_path in prefs.items():
+            if cache is not None:
+                parsed, text, digest = cache.load(file_path, parse_preference_file)
+            else:
+                parsed = parse_preference_file(file_path)
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+                digest = file_hash(file_path)
+            data['all_preferences'][person_name][pref_type] = parsed
+            data['texts'][person_name][pref_type] = text
+            data['hashes'][person_name][pref_type] = digest
+    
+    if cache is not None:
+        cache.prune({path for prefs in people_preferences.values() for path in prefs.values()})
+    return data
+
 def get_person_colors(num_people):
     """Generate unique green and red shades for each person."""
     # Greens: from light to dark
@@ -135,26 +185,225 @@ def get_person_colors(num_people):
     reds = [red_shades[i % len(red_shades)] for i in range(num_people)]
     return greens, reds
 
-def visualize_preferences():
-    """Create a visualization of all edit preferences."""
-    # Video information
-    videos = ['A019', 'A011', 'A005']  # A005 (top), A011 (middle), A019 (bottom)
-    video_duration = 3 * 60 + 30  # 3:30 minutes in seconds
+def draw_range_labels(ax, intervals, bar_height, rows=None, fontsize=8):
+    """Label each distinct range below its bar, skipping labels that would overlap.
+    
+    Identical ranges from several people share one label. Longer ranges are
+    placed first; a label that would run into one already placed on the same
+    row is culled. Only the given video rows are labelled (all by default).
+    Returns ({row: [Text, ...]}, number of culled labels).
+    """
+    fig = ax.figure
+    x_min, x_max = ax.get_xlim()
+    seconds_per_pixel = (x_max - x_min) / ax.get_window_extent().width
+    char_width = fontsize * 0.62 * fig.dpi / 72  # Rough width of a bold digit in pixels
+    
+    texts = {}
+    culled = 0
+    for video_index in (range(len(intervals.videos)) if rows is None else rows):
+        selected = intervals.video == video_index
+        spans = set(zip(intervals.starts[selected].tolist(), intervals.ends[selected].tolist()))
+        placed = []
+        texts[video_index] = []
+        for start_sec, end_sec in sorted(spans, key=lambda span: (span[0] - span[1], span[0])):
+            time_label = f"{format_time(start_sec)}-{format_time(end_sec)}"
+            center_x = (start_sec + end_sec) / 2
+            half_width = (len(time_label) + 1) * char_width * seconds_per_pixel / 2
+            left, right = center_x - half_width, center_x + half_width
+            if any(left < other_right and other_left < right for other_left, other_right in placed):
+                culled += 1
+                continue
+            placed.append((left, right))
+            bottom_y = video_index - bar_height/2 - 0.05
+            texts[video_index].append(ax.text(center_x, bottom_y, time_label, 
+                   ha='center', va='top', fontsize=fontsize, fontweight='bold',
+                   color='black', backgroundcolor='white', alpha=0.8))
+    return texts, culled
+
+def person_layer_colors(person_names):
+    """{person: {'want': green shade, 'nowant': red shade}} in person order."""
+    greens, reds = get_person_colors(len(person_names))
+    return {name: {'want': greens[i], 'nowant': reds[i]} for i, name in enumerate(person_names)}
+
+class PreferenceFigure:
+    """The preference chart, with one replaceable artist per layer.
+    
+    Every (person, want/nowant) layer is a single PatchCollection and every
+    video row keeps its own time labels, so watch mode can swap only the
+    layers and rows that changed while the figure stays alive.
+    """
+    
     row_height = 1.0
     bar_height = 0.7
+    
+    def __init__(self, videos=VIDEOS, video_duration=VIDEO_DURATION, label=('3', '2', '1'), figsize=(15, 6), title=CHART_TITLE):
+        self.videos = videos
+        self.layers = {}  # (person, pref_type) -> PatchCollection
+        self.row_texts = {}  # video row -> [Text, ...]
+        self.legend = None
+        
+        # Create the visualization
+        self.figsize = figsize
+        self.fig, ax = plt.subplots(figsize=figsize)
+        self.ax = ax
+        
+        # Set up the plot
+        ax.set_xlim(0, video_duration)
+        ax.set_ylim(-0.5, len(videos) - 0.5)
+        
+        # Add video labels on y-axis
+        ax.set_yticks(range(len(videos)))
+        ax.set_yticklabels(label)
+        #ax.set_yticklabels(videos)
+        #ax.set_ylabel('Videos')
+        
+        # Add time labels on x-axis (every 30 seconds)
+        time_ticks = list(range(0, video_duration + 1, 30))
+        time_labels = [f"{t//60}:{t%60:02d}" for t in time_ticks]
+        ax.set_xticks(time_ticks)
+        ax.set_xticklabels(time_labels)
+        ax.set_xlabel('Time (MM:SS)')
+        
+        # Add grid
+        ax.grid(True, alpha=0.3)
+        
+        # Draw video timeline bars (all same height) as one collection
+        timelines = [patches.Rectangle((0, i - self.row_height/2), video_duration, self.row_height) for i in range(len(videos))]
+        ax.add_collection(PatchCollection(timelines, linewidth=1, edgecolor='black', facecolor='lightgray', alpha=0.5))
+        for i, video in enumerate(videos):
+            # Add video label
+            ax.text(-10, i, video, ha='right', va='center', fontweight='bold')
+        
+        # Add title
+        ax.set_title(title, 
+                     fontsize=14, fontweight='bold', pad=20)
+        
+        # Adjust layout to make room for bottom legend
+        self.fig.subplots_adjust(bottom=0.2)
+        params = self.fig.subplotpars
+        self.initial_layout = dict(left=params.left, right=params.right, bottom=params.bottom, top=params.top)
+    
+    def set_layer(self, intervals, person_name, pref_type, color, order):
+        """Draw (or redraw) one person's wanted or unwanted blocks as a single collection.
+        
+        order fixes the stacking between layers (person order, want before nowant).
+        """
+        self.remove_layer(person_name, pref_type)
+        selected = (intervals.person == intervals.people.index(person_name)) & (intervals.kind == KINDS.index(pref_type))
+        blocks = [patches.Rectangle((start_sec, video_index - self.bar_height/2), end_sec - start_sec, self.bar_height)
+                  for start_sec, end_sec, video_index in zip(intervals.starts[selected], intervals.ends[selected], intervals.video[selected])]
+        if blocks:
+            collection = PatchCollection(blocks, linewidth=1, edgecolor='black', facecolor=color, alpha=0.7,
+                                         zorder=1 + 0.001 * (order + 1))
+            self.ax.add_collection(collection)
+            self.layers[(person_name, pref_type)] = collection
+    
+    def remove_layer(self, person_name, pref_type):
+        collection = self.layers.pop((person_name, pref_type), None)
+        if collection is not None:
+            collection.remove()
+    
+    def draw_labels(self, intervals, rows=None):
+        """Redraw the time labels of the given rows (all by default); returns the number culled."""
+        for row in (range(len(self.videos)) if rows is None else rows):
+            for text in self.row_texts.pop(row, []):
+                text.remove()
+        texts, culled = draw_range_labels(self.ax, intervals, self.bar_height, rows)
+        self.row_texts.update(texts)
+        return culled
+    
+    def set_legend(self, person_to_colors):
+        """Legend entries for both want and nowant of every person."""
+        legend_elements = []
+        for person_name, colors in person_to_colors.items():
+            legend_elements.append(patches.Patch(color=colors['want'], label=f'{person_name} wanted parts'))
+            legend_elements.append(patches.Patch(color=colors['nowant'], label=f'{person_name} unwanted parts'))
+        if self.legend is not None:
+            self.legend.remove()
+        self.legend = self.ax.legend(handles=legend_elements, loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=2)
+    
+    def draw_all(self, intervals, person_to_colors):
+        """Draw every layer, the labels and the legend; returns the number of culled labels."""
+        for p, person_name in enumerate(intervals.people):
+            for k, pref_type in enumerate(KINDS):
+                # Person's green shade for wanted parts, red shade for unwanted parts
+                self.set_layer(intervals, person_name, pref_type, person_to_colors[person_name][pref_type], 2 * p + k)
+        self.set_legend(person_to_colors)
+        return self.draw_labels(intervals)
+    
+    def save(self, output_path, dpi):
+        # Adjust layout
+        self.fig.tight_layout()
+        self.fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
+        # Back to the initial layout: tight_layout depends on where it starts and
+        # label culling on the axes width, so a redraw must match a fresh figure
+        self.fig.subplots_adjust(**self.initial_layout)
+    
+    def fit_layout(self, dpi):
+        """Lay the figure out once for repeated save_fitted calls (watch mode).
+        
+        The figure is resized to its tight bounding box, as save() crops it on
+        every call, and the legend's pixels are kept since it only changes with
+        the people. Call again after set_legend; the label culling follows the
+        new axes width, so redraw the labels afterwards.
+        """
+        self.fig.set_size_inches(self.figsize)
+        self.fig.subplots_adjust(**self.initial_layout)
+        self.fig.set_dpi(dpi)
+        # Same as tight_layout, but without leaving a layout engine on the figure,
+        # which would make every savefig lay the figure out again
+        TightLayoutEngine().execute(self.fig)
+        crop = self.fig.get_tightbbox(self.fig.canvas.get_renderer()).padded(plt.rcParams['savefig.pad_inches'])
+        
+        # Make the crop the whole figure, keeping the axes where they are on the page
+        width, height = self.fig.get_size_inches()
+        left, bottom, ax_width, ax_height = self.ax.get_position().bounds
+        self.fig.set_size_inches(crop.width, crop.height)
+        self.ax.set_position([(left * width - crop.x0) / crop.width, (bottom * height - crop.y0) / crop.height,
+                              ax_width * width / crop.width, ax_height * height / crop.height])
+        
+        self.legend.set_visible(True)
+        self.fig.canvas.draw()
+        self.legend_pixels = self.fig.canvas.copy_from_bbox(self.legend.get_window_extent())
+    
+    def save_fitted(self, output_path):
+        """Save with the layout from fit_layout: one draw, with the legend pasted back from its pixels."""
+        self.legend.set_visible(False)
+        self.fig.canvas.draw()
+        self.legend.set_visible(True)
+        self.fig.canvas.restore_region(self.legend_pixels)
+        # Fast PNG compression: the live image is rewritten on every edit
+        plt.imsave(output_path, np.asarray(self.fig.canvas.buffer_rgba()), dpi=self.fig.dpi,
+                   pil_kwargs={'compress_level': 1})
+    
+    def close(self):
+        plt.close(self.fig)
+
+def visualize_preferences(data=None, cache=None, force=False):
+    """Create a visualization of all edit preferences.
+    
+    data comes from load_dataset (loaded here if not given). With a cache,
+    an earlier image rendered from the same inputs and settings is reused
+    unless force is set. Returns the image path.
+    """
+    # Video information
+    videos = VIDEOS
+    video_duration = VIDEO_DURATION
     label = ['3', '2', '1']
     
+    dpi = 300
+    figsize = (15, 6)
+    
     # Get preference files from input directory
-    input_dir = 'input'
-    people_preferences, _ = get_preference_files(input_dir)
+    if data is None:
+        data = load_dataset('input')
+    people_preferences = data['people_preferences']
     
     if not people_preferences:
         print("No preference files found in the input directory!")
         return
     
-    person_names = list(people_preferences.keys())
-    greens, reds = get_person_colors(len(person_names))
-    person_to_colors = {name: {'want': greens[i], 'nowant': reds[i]} for i, name in enumerate(person_names)}
+    person_to_colors = person_layer_colors(list(people_preferences.keys()))
     
     print(f"Found preferences for {len(people_preferences)} people:")
     for person_name, prefs in people_preferences.items():
@@ -162,100 +411,22 @@ def visualize_preferences():
         for pref_type, file_path in prefs.items():
             print(f"    {pref_type}: {file_path}")
     
-    # Parse all preference files
-    all_preferences = {}
-    for person_name, prefs in people_preferences.items():
-        all_preferences[person_name] = {}
-        for pref_type, file_path in prefs.items():
-            all_preferences[person_name][pref_type] = parse_preference_file(file_path)
-    
-    # Create the visualization
-    fig, ax = plt.subplots(figsize=(15, 6))
-    
-    # Set up the plot
-    ax.set_xlim(0, video_duration)
-    ax.set_ylim(-0.5, len(videos) - 0.5)
-    
-    # Add video labels on y-axis
-    ax.set_yticks(range(len(videos)))
-    ax.set_yticklabels(label)
-    #ax.set_yticklabels(videos)
-    #ax.set_ylabel('Videos')
-    
-    # Add time labels on x-axis (every 30 seconds)
-    time_ticks = list(range(0, video_duration + 1, 30))
-    time_labels = [f"{t//60}:{t%60:02d}" for t in time_ticks]
-    ax.set_xticks(time_ticks)
-    ax.set_xticklabels(time_labels)
-    ax.set_xlabel('Time (MM:SS)')
-    
-    # Add grid
-    ax.grid(True, alpha=0.3)
-    
-    # Draw video timeline bars (all same height)
-    for i, video in enumerate(videos):
-        # Draw the full video timeline
-        rect = patches.Rectangle((0, i - row_height/2), video_duration, row_height, 
-                               linewidth=1, edgecolor='black', 
-                               facecolor='lightgray', alpha=0.5)
-        ax.add_patch(rect)
-        
-        # Add video label
-        ax.text(-10, i, video, ha='right', va='center', fontweight='bold')
-    
-    # Draw preference blocks for each person
-    legend_elements = []
-    for person_name, prefs in all_preferences.items():
-        want_color = person_to_colors[person_name]['want']
-        nowant_color = person_to_colors[person_name]['nowant']
-        
-        for video in videos:
-            # Draw wanted time ranges (person's green shade)
-            if 'want' in prefs and video in prefs['want']:
-                for start_sec, end_sec in prefs['want'][video]:
-                    video_index = videos.index(video)
-                    rect = patches.Rectangle((start_sec, video_index - bar_height/2), 
-                                           end_sec - start_sec, bar_height,
-                                           linewidth=1, edgecolor='black',
-                                           facecolor=want_color, alpha=0.7)
-                    ax.add_patch(rect)
-                    center_x = (start_sec + end_sec) / 2
-                    bottom_y = video_index - bar_height/2 - 0.05
-                    time_label = f"{start_sec//60}:{start_sec%60:02d}-{end_sec//60}:{end_sec%60:02d}"
-                    ax.text(center_x, bottom_y, time_label, 
-                           ha='center', va='top', fontsize=8, fontweight='bold',
-                           color='black', backgroundcolor='white', alpha=0.8)
-            # Draw unwanted time ranges (person's red shade)
-            if 'nowant' in prefs and video in prefs['nowant']:
-                for start_sec, end_sec in prefs['nowant'][video]:
-                    video_index = videos.index(video)
-                    rect = patches.Rectangle((start_sec, video_index - bar_height/2), 
-                                           end_sec - start_sec, bar_height,
-                                           linewidth=1, edgecolor='black',
-                                           facecolor=nowant_color, alpha=0.7)
-                    ax.add_patch(rect)
-                    center_x = (start_sec + end_sec) / 2
-                    bottom_y = video_index - bar_height/2 - 0.05
-                    time_label = f"{start_sec//60}:{start_sec%60:02d}-{end_sec//60}:{end_sec%60:02d}"
-                    ax.text(center_x, bottom_y, time_label, 
-                           ha='center', va='top', fontsize=8, fontweight='bold',
-                           color='black', backgroundcolor='white', alpha=0.8)
-        # Add to legend: both want and nowant
-        legend_elements.append(patches.Patch(color=want_color, label=f'{person_name} wanted parts'))
-        legend_elements.append(patches.Patch(color=nowant_color, label=f'{person_name} unwanted parts'))
-    
-    # Add legend
-    ax.legend(handles=legend_elements, loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=2)
-    
-    # Add title
-    plt.title('Dance Video Edit Preferences\n(Green = wanted parts, Red = unwanted parts)', 
-              fontsize=14, fontweight='bold', pad=20)
-    
-    # Adjust layout to make room for bottom legend
-    plt.subplots_adjust(bottom=0.2)
-    
-    # Adjust layout
-    plt.tight_layout()
+    # Reuse the last image if neither the inputs nor the settings changed
+    settings = {'videos': videos, 'duration': video_duration, 'labels': label, 'dpi': dpi,
+                'figsize': figsize, 'version': RENDER_VERSION}
+    render_key = PreferenceCache.render_key(data['hashes'], settings)
+    if cache is not None and not force:
+        existing = cache.get_render(render_key)
+        if existing:
+            print(f"Inputs unchanged, reusing '{existing}'")
+            return existing
+    
+    # Draw every layer from the parsed preference files
+    figure = PreferenceFigure(videos, video_duration, label, figsize)
+    intervals = PreferenceIntervals(data['all_preferences'], videos, video_duration)
+    culled = figure.draw_all(intervals, person_to_colors)
+    if culled:
+        print(f"Skipped {culled} overlapping time labels")
     
     # Generate output filename with number
     output_dir = 'output'
@@ -264,44 +435,262 @@ def visualize_preferences():
     output_path = os.path.join(output_dir, output_filename)
     
     # Save the plot
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    figure.save(output_path, dpi)
     print(f"Visualization saved as '{output_path}'")
+    if cache is not None:
+        cache.put_render(render_key, output_path)
     
     # Show the plot (will not display in WSL, but left for completeness)
     plt.show()
+    figure.close()
+    return output_path
+
+def layer_styles(person_to_colors):
+    """{(person, pref_type): (color, stacking order)} for every layer."""
+    return {(person_name, pref_type): (colors[pref_type], 2 * p + k)
+            for p, (person_name, colors) in enumerate(person_to_colors.items())
+            for k, pref_type in enumerate(KINDS)}
+
+def watch_preferences(input_dir='input', debounce=WATCH_DEBOUNCE, poll_interval=1.0, use_inotify=True, dpi=WATCH_DPI):
+    """Keep one figure alive and redraw only what changed whenever preference files change.
+    
+    The warm process keeps the parse cache and the figure between updates.
+    A changed file only rebuilds its own layer and the labels of the video
+    rows it touches; people being added or removed also restyles the layers
+    whose color or stacking moved, and the legend. The layout is fitted
+    once (and again only when the legend changes), so an update costs a
+    single draw of the figure. Runs until Ctrl+C.
+    """
+    cache = PreferenceCache()
+    data = load_dataset(input_dir, cache)
+    person_to_colors = person_layer_colors(list(data['people_preferences']))
+    intervals = PreferenceIntervals(data['all_preferences'], VIDEOS, VIDEO_DURATION)
+    figure = PreferenceFigure()
+    figure.draw_all(intervals, person_to_colors)
+    figure.fit_layout(dpi)
+    figure.draw_labels(intervals)  # Cull the labels for the fitted axes width
+    figure.save_fitted(WATCH_OUTPUT)
+    cache.save()
+    print(f"Live visualization saved as '{WATCH_OUTPUT}' (Ctrl+C to stop)")
+    
+    try:
+        for changed_files in watch_changes(input_dir, '*.txt', debounce, poll_interval, use_inotify):
+            try:
+                start = time.perf_counter()
+                new_data = load_dataset(input_dir, cache)
+                new_colors = person_layer_colors(list(new_data['people_preferences']))
+                
+                # Layers whose file changed, appeared or disappeared
+                old_hashes = {(person, t): h for person, hashes in data['hashes'].items() for t, h in hashes.items()}
+                new_hashes = {(person, t): h for person, hashes in new_data['hashes'].items() for t, h in hashes.items()}
+                changed = {key for key in old_hashes.keys() | new_hashes.keys() if old_hashes.get(key) != new_hashes.get(key)}
+                # Layers whose color or stacking moved because people were added or removed
+                old_styles, new_styles = layer_styles(person_to_colors), layer_styles(new_colors)
+                restyled = {key for key in new_styles if key in new_hashes and old_styles.get(key) != new_styles[key]}
+                if not changed and not restyled:
+                    continue
+                
+                new_intervals = PreferenceIntervals(new_data['all_preferences'], VIDEOS, VIDEO_DURATION)
+                for person_name, pref_type in changed | restyled:
+                    if (person_name, pref_type) in new_hashes:
+                        color, order = new_styles[(person_name, pref_type)]
+                        figure.set_layer(new_intervals, person_name, pref_type, color, order)
+                    else:
+                        figure.remove_layer(person_name, pref_type)
+                
+                # Only rows with a changed range need new labels
+                rows = set()
+                for person_name, pref_type in changed:
+                    old_ranges = data['all_preferences'].get(person_name, {}).get(pref_type, {})
+                    new_ranges = new_data['all_preferences'].get(person_name, {}).get(pref_type, {})
+                    for video in old_ranges.keys() | new_ranges.keys():
+                        if video in VIDEOS and old_ranges.get(video) != new_ranges.get(video):
+                            rows.add(VIDEOS.index(video))
+                if list(new_colors.items()) != list(person_to_colors.items()):
+                    # A new legend moves the axes, which changes the culling of every row
+                    figure.set_legend(new_colors)
+                    figure.fit_layout(dpi)
+                    rows = set(range(len(VIDEOS)))
+                figure.draw_labels(new_intervals, sorted(rows))
+                
+                figure.save_fitted(WATCH_OUTPUT)
+                cache.save()
+                data, person_to_colors = new_data, new_colors
+                print(f"{', '.join(sorted(changed_files))} changed: redrew {len(changed | restyled)} layer(s), "
+                      f"{len(rows)} label row(s) in {time.perf_counter() - start:.2f}s")
+            except Exception as e:
+                # A file can vanish or be half-written between the change and the read:
+                # keep the last good data and figure and wait for the next change
+                print(f"Warning: could not update after {', '.join(sorted(changed_files))} changed: {e}")
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        figure.close()
+        cache.save()
+
+def export_targets(videos=VIDEOS):
+    """Every output of the export stage as (name, file name, dpi, video or None for the whole chart)."""
+    targets = [
+        ('chart', 'edit_preferences.png', 300, None),
+        ('svg', 'edit_preferences.svg', None, None),
+        ('thumbnail', 'edit_preferences_thumb.png', EXPORT_THUMBNAIL_DPI, None),
+    ]
+    targets += [(f'detail {video}', f'edit_preferences_{video}.png', EXPORT_DETAIL_DPI, video) for video in videos]
+    return targets
+
+def detail_figure(all_preferences, video):
+    """Chart of a single video with one row per person; returns (figure, intervals).
+    
+    The rows take the place of the videos in the main chart, so each
+    person's ranges are drawn and labelled on their own row.
+    """
+    people = list(all_preferences)
+    by_person = {person_name: {pref_type: {person_name: prefs.get(pref_type, {}).get(video, [])} for pref_type in prefs}
+                 for person_name, prefs in all_preferences.items()}
+    rows = people[::-1]  # First person on top
+    figure = PreferenceFigure(rows, VIDEO_DURATION, [''] * len(rows), (15, 2 + 0.6 * len(rows)),
+                              f'{video} Edit Preferences by Person\n(Green = wanted parts, Red = unwanted parts)')
+    return figure, PreferenceIntervals(by_person, rows, VIDEO_DURATION)
 
-def print_summary():
+_export_data = {}  # Parsed preferences of the export pool, set once per worker
+
+def init_export_worker(all_preferences):
+    _export_data['all_preferences'] = all_preferences
+    _export_data['colors'] = person_layer_colors(list(all_preferences))
+
+def render_target(target):
+    """Draw one export target on its own figure; returns (name, path, seconds)."""
+    name, output_path, dpi, video = target
+    start = time.perf_counter()
+    all_preferences = _export_data['all_preferences']
+    if video is None:
+        figure = PreferenceFigure()
+        intervals = PreferenceIntervals(all_preferences, VIDEOS, VIDEO_DURATION)
+    else:
+        figure, intervals = detail_figure(all_preferences, video)
+    figure.draw_all(intervals, _export_data['colors'])
+    figure.save(output_path, dpi)
+    figure.close()
+    return name, output_path, time.perf_counter() - start
+
+def export_all(data=None, workers=None, output_dir=None):
+    """Render every export target in parallel and report how long each one took.
+    
+    The parsed dataset is handed to each worker once when the pool starts;
+    every target is then drawn on its own figure with the Agg backend.
+    Files go to a new numbered folder (output/export_NN) unless output_dir is given.
+    """
+    if data is None:
+        data = load_dataset('input')
+    if not data['all_preferences']:
+        print("No preference files found in the input directory!")
+        return
+    if output_dir is None:
+        output_dir = os.path.join('output', f"export_{get_next_output_number('output', 'export_*'):02d}")
+    os.makedirs(output_dir, exist_ok=True)
+    
+    targets = [(name, os.path.join(output_dir, filename), dpi, video) for name, filename, dpi, video in export_targets()]
+    workers = workers or min(len(targets), os.cpu_count() or 1)
+    print(f"\nExporting {len(targets)} targets with {workers} workers...")
+    start = time.perf_counter()
+    timings = []
+    with Pool(workers, initializer=init_export_worker, initargs=(data['all_preferences'],)) as pool:
+        for name, output_path, seconds in pool.imap_unordered(render_target, targets):
+            print(f"  {name:<12} {seconds:6.2f}s  {output_path}")
+            timings.append((seconds, name))
+    elapsed = time.perf_counter() - start
+    
+    slowest_seconds, slowest = max(timings)
+    print(f"Exported to '{output_dir}' in {elapsed:.2f}s ({sum(t for t, _ in timings):.2f}s of rendering), "
+          f"slowest: {slowest} ({slowest_seconds:.2f}s)")
+    return output_dir
+
+def print_summary(data=None):
     """Print a summary of all preferences."""
     print("\n=== EDIT PREFERENCES SUMMARY ===\n")
     
-    input_dir = 'input'
-    people_preferences, person_colors = get_preference_files(input_dir)
+    if data is None:
+        data = load_dataset('input')
     
-    for person_name, prefs in people_preferences.items():
+    for person_name, prefs in data['people_preferences'].items():
         print(f"{person_name}'s preferences:")
-        for pref_type, file_path in prefs.items():
+        for pref_type in prefs:
             print(f"  {pref_type.upper()}:")
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if content:
-                        for line in content.split('\n'):
-                            print(f"    {line}")
-                    else:
-                        print("    No preferences specified")
+            content = data['texts'][person_name][pref_type].strip()
+            if content:
+                for line in content.split('\n'):
+                    print(f"    {line}")
             else:
-                print(f"    File {file_path} not found")
+                print("    No preferences specified")
         print()
 
+def print_consensus(min_want=1, max_nowant=0, export_path=None, data=None):
+    """Print the parts to keep and cut: wanted by at least min_want people and unwanted by at most max_nowant."""
+    if data is None:
+        data = load_dataset('input')
+    intervals = PreferenceIntervals(data['all_preferences'], VIDEOS, VIDEO_DURATION)
+    ranges = intervals.keep_cut_ranges(min_want, max_nowant)
+    
+    print(f"\n=== CONSENSUS (wanted by >= {min_want}, unwanted by <= {max_nowant}) ===\n")
+    for video, parts in ranges.items():
+        print(f"{video}:")
+        for part, spans in parts.items():
+            labels = ' '.join(f"{format_time(start)}-{format_time(end)}" for start, end in spans)
+            print(f"  {part.upper()}: {labels or 'none'}")
+    
+    if export_path:
+        export_ranges(ranges, export_path, {'min_want': min_want, 'max_nowant': max_nowant})
+        print(f"\nRanges saved as '{export_path}'")
+    return ranges
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Visualize dance edit preferences')
+    parser.add_argument('--min-want', type=int, help='Also print keep/cut ranges wanted by at least this many people')
+    parser.add_argument('--max-nowant', type=int, default=0, help='Unwanted by at most this many people (default: 0)')
+    parser.add_argument('--export-ranges', help='Save the keep/cut ranges to this JSON file (implies --min-want 1)')
+    parser.add_argument('--force', action='store_true', help='Render a new image even if the inputs are unchanged')
+    parser.add_argument('--watch', action='store_true', help=f"Keep running and update '{WATCH_OUTPUT}' whenever an input file changes")
+    parser.add_argument('--poll', action='store_true', help='Watch by polling instead of inotify (e.g. for Windows drives in WSL)')
+    parser.add_argument('--debounce', type=float, default=WATCH_DEBOUNCE, help='Seconds to wait for edits to settle in watch mode')
+    parser.add_argument('--export', action='store_true', help='Also render the chart, SVG, thumbnail and per-video charts in parallel')
+    parser.add_argument('--workers', type=int, help='Processes for --export (default: one per target, up to the CPU count)')
+    parser.add_argument('--edl', help='Save the keep ranges as a CMX 3600 EDL to this file (implies --min-want 1)')
+    parser.add_argument('--cut', action='store_true', help='Cut the videos down to the keep ranges with ffmpeg (implies --min-want 1)')
+    parser.add_argument('--video-dir', default='videos', help="Folder with the source videos for --cut, named like A005.mp4 (default: 'videos')")
+    args = parser.parse_args()
+    
     print("Dance Edit Preferences Visualizer")
     print("=" * 40)
     
+    if args.watch:
+        watch_preferences('input', args.debounce, use_inotify=not args.poll)
+        raise SystemExit
+    
+    # Parse the input once (only changed files are re-parsed)
+    cache = PreferenceCache()
+    data = load_dataset('input', cache)
+    
     # Print summary first
-    print_summary()
+    print_summary(data)
     
     # Create visualization
     print("Creating visualization...")
-    visualize_preferences()
+    visualize_preferences(data, cache, force=args.force)
+    cache.save()
+    
+    # Keep/cut ranges from the consensus rule
+    if args.min_want is not None or args.export_ranges or args.edl or args.cut:
+        ranges = print_consensus(args.min_want if args.min_want is not None else 1, args.max_nowant, args.export_ranges, data)
+        if args.edl:
+            events = write_edl(ranges, args.edl)
+            print(f"EDL with {events} events saved as '{args.edl}'")
+        if args.cut:
+            cuts_dir = os.path.join('output', f"cuts_{get_next_output_number('output', 'cuts_*'):02d}")
+            print(f"\nCutting videos from '{args.video_dir}' into '{cuts_dir}'...")
+            cut_videos(ranges, args.video_dir, cuts_dir)
+    
+    # Every export format, rendered in parallel
+    if args.export:
+        export_all(data, args.workers)
     
     print("\nDone! Check the 'output' folder for the visualization.") 
\ No newline at end of file
@@ -0,0 +1,164 @@
+import os
+import csv
+import json
+import time
+import argparse
+from multiprocessing import Pool
+from qr_style import make_qr_image, make_matrix
+from qr_vector import save_svg, pdf_content, pdf_document
+from qr_logo import logo_path, load_logo, preload
+from qr_filenames import get_next_available_filename, release_filename
+
+# ---- SETTINGS ----
+BASE_FILENAME = "kiri_work_qr_"
+EXTENSION = ".png"
+CHUNKSIZE = 16  # Rows sent to a worker at a time
+
+def read_rows(path):
+    """Yield one dict per row of a CSV (with header) or JSONL file, without loading it all"""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield row
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+def row_options(row, box_size, logo=None, bg_color="white", dot_color="black", style="Square"):
+    """Drawing options of one row, falling back to the batch defaults"""
+    return {
+        "dot_color": row.get("dot_color") or dot_color,
+        "bg_color": row.get("bg_color") or bg_color,
+        "style": row.get("style") or style,
+        "box_size": int(row.get("box_size") or box_size),
+        "logo": row.get("logo") or logo,
+    }
+
+def make_tasks(rows, folder, base_filename, extension, box_size, logo=None, bg_color="white", dot_color="black", style="Square"):
+    """Turn input rows into render tasks with deterministic output names.
+
+    Rows without a filename are numbered in input order from the folder's
+    counter (see qr_filenames), so the folder is never listed per code and
+    the same input always maps to consecutive names.
+    """
+    for line_no, row in enumerate(rows, start=1):
+        payload = row.get("payload") or row.get("url")
+        filename = row.get("filename")
+        if not filename:
+            filename = get_next_available_filename(folder, base_filename, extension) if payload else ""
+        elif not os.path.splitext(filename)[1]:
+            filename += extension
+        yield {
+            "line": line_no,
+            "payload": payload,
+            "path": os.path.join(folder, filename),
+            **row_options(row, box_size, logo, bg_color, dot_color, style),
+        }
+
+def render(task):
+    """Worker: build and save one QR code, returning (line, filename, error)"""
+    if not task["payload"]:
+        return task["line"], None, "missing payload/url"
+    try:
+        if task["path"].lower().endswith(".svg"):
+            if logo_path(task["logo"]) is not None:
+                raise ValueError("logos are only supported for PNG output")
+            save_svg(task["payload"], task["path"], task["bg_color"], task["dot_color"], task["style"], task["box_size"])
+        else:
+            img = make_qr_image(task["payload"], task["bg_color"], task["dot_color"], task["style"], task["box_size"], logo=task["logo"])
+            img.save(task["path"])
+    except Exception as e:
+        release_filename(*os.path.split(task["path"]))  # Drop the reserved, still empty file
+        return task["line"], None, str(e)
+    return task["line"], os.path.basename(task["path"]), None
+
+def render_page(task):
+    """Worker: draw one row as a PDF page, returning (line, (content, size), error)"""
+    if not task["payload"]:
+        return task["line"], None, "missing payload/url"
+    try:
+        if logo_path(task["logo"]) is not None:
+            raise ValueError("logos are only supported for PNG output")
+        page = pdf_content(make_matrix(task["payload"]), task["bg_color"], task["dot_color"], task["style"], task["box_size"])
+    except Exception as e:
+        return task["line"], None, str(e)
+    return task["line"], page, None
+
+def run_batch(input_file, folder, workers=None, base_filename=BASE_FILENAME, extension=EXTENSION, box_size=10, logo=None,
+              bg_color="white", dot_color="black", style="Square"):
+    """Render every row of input_file into folder and return (done, failed)"""
+    os.makedirs(folder, exist_ok=True)
+    tasks = make_tasks(read_rows(input_file), folder, base_filename, extension, box_size, logo, bg_color, dot_color, style)
+
+    # Decode the batch's logo once here and hand it to every worker
+    decoded = {}
+    if logo_path(logo) is not None:
+        decoded[logo_path(logo)] = load_logo(logo_path(logo))
+
+    done = failed = 0
+    start = time.perf_counter()
+    with Pool(workers, initializer=preload, initargs=(decoded,)) as pool:
+        for line, filename, error in pool.imap(render, tasks, chunksize=CHUNKSIZE):
+            if error:
+                failed += 1
+                print(f"❌ Row {line}: {error}")
+            else:
+                done += 1
+    elapsed = time.perf_counter() - start
+
+    rate = done / elapsed if elapsed > 0 else 0
+    print(f"✅ {done} QR codes saved to {folder} in {elapsed:.2f}s ({rate:.1f} codes/sec)")
+    if failed:
+        print(f"⚠️ {failed} rows failed")
+    return done, failed
+
+def run_pdf(input_file, output_path, workers=None, box_size=10, bg_color="white", dot_color="black", style="Square"):
+    """Render every row of input_file as one page of a single PDF and return (done, failed)"""
+    tasks = ({"line": line_no, "payload": row.get("payload") or row.get("url"),
+              **row_options(row, box_size, None, bg_color, dot_color, style)}
+             for line_no, row in enumerate(read_rows(input_file), start=1))
+
+    pages = []
+    failed = 0
+    start = time.perf_counter()
+    with Pool(workers) as pool:
+        # imap keeps the pages in input order
+        for line, page, error in pool.imap(render_page, tasks, chunksize=CHUNKSIZE):
+            if error:
+                failed += 1
+                print(f"❌ Row {line}: {error}")
+            else:
+                pages.append(page)
+    if pages:
+        with open(output_path, "wb") as f:
+            f.write(pdf_document(pages))
+    elapsed = time.perf_counter() - start
+
+    rate = len(pages) / elapsed if elapsed > 0 else 0
+    print(f"✅ {len(pages)} QR codes saved to {output_path} in {elapsed:.2f}s ({rate:.1f} codes/sec)")
+    if failed:
+        print(f"⚠️ {failed} rows failed")
+    return len(pages), failed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate QR codes in bulk from a CSV or JSONL file")
+    parser.add_argument("input", help="CSV with a header row, or JSONL; columns: payload (or url), filename, dot_color, bg_color, style, box_size, logo")
+    parser.add_argument("--folder", default=".", help="Folder to save the QR codes in")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--base", default=BASE_FILENAME, help="Base filename for rows without a filename")
+    parser.add_argument("--box-size", type=int, default=10, help="Pixels per module")
+    parser.add_argument("--svg", action="store_true", help="Save rows without a filename as SVG instead of PNG")
+    parser.add_argument("--logo", help="Logo for rows without one: a name from qr_logo.LOGOS or an image path")
+    parser.add_argument("--pdf", help="Save all rows as the pages of this one PDF instead of separate files (no logos)")
+    parser.add_argument("--bg-color", default="white", help="Background color for rows without one")
+    parser.add_argument("--dot-color", default="black", help="Dot color for rows without one")
+    parser.add_argument("--style", default="Square", help="Style for rows without one")
+    args = parser.parse_args()
+
+    if args.pdf:
+        run_pdf(args.input, args.pdf, args.workers, args.box_size, args.bg_color, args.dot_color, args.style)
+    else:
+        run_batch(args.input, args.folder, args.workers, args.base, ".svg" if args.svg else EXTENSION, args.box_size, args.logo,
+                  args.bg_color, args.dot_color, args.style)
@@ -0,0 +1,124 @@
+import io
+import json
+import time
+import argparse
+import platform
+import qrcode
+import numpy as np
+import PIL
+from qr_style import STYLES, make_matrix, render_mask, colorize
+
+ERROR_CORRECTION = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H,
+}
+STAGES = ["encode", "style", "save", "total"]
+PERCENTILES = [50, 90, 99]
+
+def make_payload(length):
+    """URL-like payload of the given length (same text on every run)"""
+    base = "https://kiri.work/"
+    return (base + "abcdefghijklmnopqrstuvwxyz0123456789" * (length // 36 + 1))[:max(length, len(base))]
+
+def run_case(payload, ec, box_size, style, repeat, border=4):
+    """Time encode / style / save of one configuration `repeat` times, in ms"""
+    encode = make_matrix.__wrapped__  # Bypass the memo cache, the encoder is what we measure
+    times = {stage: [] for stage in STAGES}
+    size = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        matrix = encode(payload, border, ERROR_CORRECTION[ec])
+        t1 = time.perf_counter()
+        img = colorize(render_mask(matrix, style, box_size, border), "white", "black")
+        t2 = time.perf_counter()
+        buffer = io.BytesIO()
+        img.save(buffer, "PNG")
+        t3 = time.perf_counter()
+        times["encode"].append(1000 * (t1 - t0))
+        times["style"].append(1000 * (t2 - t1))
+        times["save"].append(1000 * (t3 - t2))
+        times["total"].append(1000 * (t3 - t0))
+        size = buffer.tell()
+
+    stats = {}
+    for stage, values in times.items():
+        stats[stage] = {f"p{p}": round(float(v), 4) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+        stats[stage]["mean"] = round(float(np.mean(values)), 4)
+    return {
+        "key": f"p{len(payload)}-{ec}-b{box_size}-{style}",
+        "payload_len": len(payload),
+        "error_correction": ec,
+        "box_size": box_size,
+        "style": style,
+        "modules": len(matrix),
+        "png_bytes": size,
+        "stats": stats,
+        "codes_per_sec": round(1000 * repeat / sum(times["total"]), 2),
+    }
+
+def compare(results, baseline_file):
+    """Print the change in median total time against an earlier results file"""
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = {case["key"]: case for case in json.load(f)["cases"]}
+    print(f"\nCompared with {baseline_file} (median total ms):")
+    for case in results["cases"]:
+        old = baseline.get(case["key"])
+        if old is None:
+            continue
+        before, after = old["stats"]["total"]["p50"], case["stats"]["total"]["p50"]
+        change = 100 * (after - before) / before if before else 0
+        print(f"{case['key']:<40} {before:>9.3f} -> {after:>9.3f} ({change:+.1f}%)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time QR encode, style and save stages across payload size, error correction, box size and style")
+    parser.add_argument("--payloads", default="16,64,256,1024", help="Payload lengths in characters")
+    parser.add_argument("--ec", default="L,M,Q,H", help="Error correction levels")
+    parser.add_argument("--box-sizes", default="4,10", help="Pixels per module")
+    parser.add_argument("--styles", default=",".join(STYLES), help="Comma separated styles")
+    parser.add_argument("--repeat", type=int, default=20, help="Codes per configuration")
+    parser.add_argument("--json", default="qr_benchmark.json", help="Where to write the results")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "qrcode": getattr(qrcode, "__version__", None) or "unknown",
+            "pillow": PIL.__version__,
+            "numpy": np.__version__,
+            "repeat": args.repeat,
+        },
+        "cases": [],
+    }
+    print(f"{'case':<40} {'modules':>7} {'encode':>8} {'style':>8} {'save':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'codes/s':>8}")
+    for length in (int(v) for v in args.payloads.split(",")):
+        payload = make_payload(length)
+        for ec in args.ec.split(","):
+            try:
+                make_matrix(payload, 4, ERROR_CORRECTION[ec])
+            except (qrcode.exceptions.DataOverflowError, ValueError):  # Newer qrcode raises ValueError past version 40
+                print(f"⚠️ p{length}-{ec}: payload too long for a QR code, skipped")
+                continue
+            for box_size in (int(v) for v in args.box_sizes.split(",")):
+                for style in args.styles.split(","):
+                    case = run_case(payload, ec, box_size, style, args.repeat)
+                    results["cases"].append(case)
+                    stats = case["stats"]
+                    print(
+                        f"{case['key']:<40} {case['modules']:>7} "
+                        f"{stats['encode']['p50']:>8.2f} {stats['style']['p50']:>8.2f} {stats['save']['p50']:>8.2f} "
+                        f"{stats['total']['p50']:>8.2f} {stats['total']['p90']:>8.2f} {stats['total']['p99']:>8.2f} "
+                        f"{case['codes_per_sec']:>8.1f}"
+                    )
+    print("(stage columns are median ms)")
+
+    with open(args.json, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=1)
+    print(f"✅ Results saved to {args.json}")
+
+    if args.compare:
+        compare(results, args.compare)
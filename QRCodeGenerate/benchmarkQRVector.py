@@ -0,0 +1,61 @@
+import json
+import time
+import argparse
+import qrcode
+import numpy as np
+from qr_style import STYLES
+from qr_vector import module_shapes, svg_document, pdf_content
+
+def version_matrix(version, payload="https://kiri.work", border=4):
+    """Module matrix of a fixed QR version (1-40), independent of payload length"""
+    qr = qrcode.QRCode(version=version, error_correction=qrcode.constants.ERROR_CORRECT_L, border=border)
+    qr.add_data(payload)
+    qr.make(fit=False)
+    return np.array(qr.get_matrix(), dtype=bool)
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def measure(matrix, style, merge, repeat):
+    """Element count, SVG/PDF size and render time of one code"""
+    shapes = module_shapes(matrix, style, merge=merge)
+    return {
+        "elements": len(shapes[0]) + len(shapes[1]),
+        "svg_bytes": len(svg_document(matrix, style=style, shapes=shapes).encode("utf-8")),
+        "pdf_bytes": len(pdf_content(matrix, style=style, shapes=shapes)[0]),
+        "svg_ms": 1000 * best_time(lambda: svg_document(matrix, style=style, shapes=module_shapes(matrix, style, merge=merge)), repeat),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare naive per-module vector output with merged runs for QR versions 1-40")
+    parser.add_argument("--style", default="Square", choices=STYLES)
+    parser.add_argument("--versions", default="1-40", help="Range of versions, e.g. 1-40 or 10-20")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats (best is kept)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    first, last = (int(v) for v in args.versions.split("-"))
+    results = []
+    print(f"{'ver':>3} {'elements':>17} {'svg KB':>15} {'pdf KB':>15} {'svg ms':>15}")
+    for version in range(first, last + 1):
+        matrix = version_matrix(version)
+        naive = measure(matrix, args.style, False, args.repeat)
+        merged = measure(matrix, args.style, True, args.repeat)
+        results.append({"version": version, "style": args.style, "naive": naive, "merged": merged})
+        print(
+            f"{version:>3} {naive['elements']:>8} {merged['elements']:>8} "
+            f"{naive['svg_bytes'] / 1024:>7.1f} {merged['svg_bytes'] / 1024:>7.1f} "
+            f"{naive['pdf_bytes'] / 1024:>7.1f} {merged['pdf_bytes'] / 1024:>7.1f} "
+            f"{naive['svg_ms']:>7.2f} {merged['svg_ms']:>7.2f}"
+        )
+    print("(each column: naive, merged)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+        print(f"✅ Results saved to {args.json}")
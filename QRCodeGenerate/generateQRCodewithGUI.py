@@ -4,55 +4,46 @@ import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog
 from PIL import ImageTk, Image
+from qr_filenames import get_next_available_filename, release_filename
+from qr_worker import QRWorker, make_thumbnail, fit_preview
+from qr_style import make_qr_image
+from qr_vector import save_svg, save_pdf, OUTPUT_FORMATS
 
-def get_next_available_filename(folder, base_filename, extension):
-    # List all files in the folder
-    existing_files = os.listdir(folder)
-    
-    # Filter files with the given base filename and extension
-    matching_files = [f for f in existing_files if f.startswith(base_filename) and f.endswith(extension)]
-    
-    # Extract numbers from the matching files
-    numbers = []
-    for filename in matching_files:
-        try:
-            # Extract the number from the filename, assuming it's like 'image_1.png', 'image_2.png', etc.
-            number = int(filename[len(base_filename):-len(extension)])
-            numbers.append(number)
-        except ValueError:
-            continue  # Skip files that don't match the expected pattern
-    
-    # Determine the next available number
-    next_number = max(numbers, default=0) + 1
-    
-    # Construct the new filename
-    new_filename = f"{base_filename}{next_number}{extension}"
-    
-    return new_filename
+PREVIEW_BOX_SIZE = 3  # Raster preview for SVG/PDF, which PIL can't open
 
-def generate_qr_code(website_url, folder, bg_color):
+def generate_qr_code(website_url, folder, bg_color, output_format="PNG"):
     # Define the base filename and extension
     base_filename = "kiri_work_qr_"
-    extension = ".png"
+    extension = OUTPUT_FORMATS[output_format]
     
     # Get the next available filename
     new_filename = get_next_available_filename(folder, base_filename, extension)
     
-    # Generate the QR code
-    qr = qrcode.QRCode(
-        version=1,  # controls the size of the QR code
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,  # controls the number of pixels for each box
-        border=4,  # controls the thickness of the border
-    )
-    qr.add_data(website_url)
-    qr.make(fit=True)
+    path = os.path.join(folder, new_filename)
+    try:
+        if output_format == "PNG":
+            # Generate the QR code
+            qr = qrcode.QRCode(
+                version=1,  # controls the size of the QR code
+                error_correction=qrcode.constants.ERROR_CORRECT_L,
+                box_size=10,  # controls the number of pixels for each box
+                border=4,  # controls the thickness of the border
+            )
+            qr.add_data(website_url)
+            qr.make(fit=True)
     
-    # Create an image from the QR code with the selected background color
-    img = qr.make_image(fill='black', back_color=bg_color)
+            # Create an image from the QR code with the selected background color
+            img = qr.make_image(fill='black', back_color=bg_color)
     
-    # Save the image with the next available filename
-    img.save(os.path.join(folder, new_filename))
+            # Save the image with the next available filename
+            img.save(path)
+        elif output_format == "SVG":
+            save_svg(website_url, path, bg_color)
+        else:
+            save_pdf([website_url], path, bg_color)
+    except Exception:
+        release_filename(folder, new_filename)  # Don't leave the reserved name behind as an empty file
+        raise
     print(f"QR code saved as: {new_filename}")
     return new_filename
 
@@ -67,13 +58,35 @@ def open_gui():
         website_url = url_entry.get()  # Get the URL from the entry
         folder_path = folder_entry.get()  # Get the folder path from the entry
         bg_color = color_combobox.get()  # Get the selected background color
+        output_format = format_combobox.get()  # Get the selected file format
 
         if website_url and folder_path:
-            filename = generate_qr_code(website_url, folder_path, bg_color)
-            result_label.config(text=f"QR code saved as: {filename}")
+            # Generate in the background; the window stays responsive
+            worker.submit(website_url=website_url, folder=folder_path, bg_color=bg_color, output_format=output_format)
+            result_label.config(text=f"Generating... ({worker.pending} in queue)", fg="black")
         else:
             result_label.config(text="Please fill in all fields!")
 
+    def render_job(website_url, folder, bg_color, output_format):
+        # Runs on the worker thread
+        filename = generate_qr_code(website_url, folder, bg_color, output_format)
+        if output_format != "PNG":
+            # Vector files can't be opened with PIL, so show a small raster of the same code
+            return filename, fit_preview(make_qr_image(website_url, bg_color, box_size=PREVIEW_BOX_SIZE))
+        return filename, make_thumbnail(os.path.join(folder, filename))
+
+    def show_result(job, result, error):
+        # Runs on the GUI thread via window.after
+        if error is not None:
+            result_label.config(text=f"Error: {error}", fg="red")
+            return
+        filename, thumb = result
+        preview = ImageTk.PhotoImage(thumb)
+        preview_label.config(image=preview)
+        preview_label.image = preview  # Keep a reference so tkinter doesn't drop it
+        queued = f" ({worker.pending} in queue)" if worker.pending else ""
+        result_label.config(text=f"QR code saved as: {filename}{queued}", fg="green")
+
     # Set up the main window
     window = tk.Tk()
     window.title("QR Code Generator")
@@ -97,13 +110,27 @@ def open_gui():
     color_combobox.set("white")  # Default background color
     color_combobox.grid(row=2, column=1, padx=10, pady=5)
 
+    # Output format selection (PNG, or SVG/PDF vectors)
+    tk.Label(window, text="Select Output Format:").grid(row=3, column=0, padx=10, pady=5)
+    format_combobox = ttk.Combobox(window, values=list(OUTPUT_FORMATS), state="readonly")
+    format_combobox.set("PNG")  # Default format
+    format_combobox.grid(row=3, column=1, padx=10, pady=5)
+
     # Generate button
     generate_button = tk.Button(window, text="Generate QR Code", command=generate)
-    generate_button.grid(row=3, column=0, columnspan=3, pady=10)
+    generate_button.grid(row=4, column=0, columnspan=3, pady=10)
 
     # Result display
     result_label = tk.Label(window, text="", fg="green")
-    result_label.grid(row=4, column=0, columnspan=3, pady=10)
+    result_label.grid(row=5, column=0, columnspan=3, pady=10)
+
+    # Preview of the last generated code
+    preview_label = tk.Label(window)
+    preview_label.grid(row=6, column=0, columnspan=3, pady=10)
+
+    # Background generation, results are picked up with window.after
+    worker = QRWorker(render_job)
+    worker.poll(window, show_result)
 
     # Start the GUI
     window.mainloop()
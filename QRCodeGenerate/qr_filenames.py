@@ -0,0 +1,65 @@
+import os
+import json
+
+COUNTER_FILE = ".qr_counter.json"  # Kept inside the folder it numbers
+
+def scan_next_number(folder, base_filename, extension):
+    """Next free number after base_filename, found by listing folder (the old, O(n) way)"""
+    numbers = []
+    for filename in os.listdir(folder):
+        if filename.startswith(base_filename) and filename.endswith(extension):
+            try:
+                # Extract the number from the filename, assuming it's like 'image_1.png', 'image_2.png', etc.
+                numbers.append(int(filename[len(base_filename):-len(extension)]))
+            except ValueError:
+                continue  # Skip files that don't match the expected pattern
+    return max(numbers, default=0) + 1
+
+def _load_counters(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save_counters(path, counters):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(counters, f, indent=1)
+    os.replace(tmp_path, path)
+
+def get_next_available_filename(folder, base_filename, extension):
+    """Reserve and return the next numbered filename, e.g. 'kiri_work_qr_7.png'.
+
+    The next number is kept in folder/.qr_counter.json, so no directory
+    listing is needed; the folder is only scanned when the counter is missing
+    or unreadable. The name is reserved by creating the file with O_EXCL, so
+    two generators running at once never get the same name even if their
+    counters race. The reserved file is empty until the caller saves over it.
+    """
+    counter_path = os.path.join(folder, COUNTER_FILE)
+    key = f"{base_filename}*{extension}"
+    counters = _load_counters(counter_path) or {}
+    number = counters.get(key)
+    if number is None:
+        number = scan_next_number(folder, base_filename, extension)
+
+    while True:
+        new_filename = f"{base_filename}{number}{extension}"
+        try:
+            fd = os.open(os.path.join(folder, new_filename), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+        except FileExistsError:
+            number += 1  # Taken by someone else (or created by hand), try the next one
+            continue
+        os.close(fd)
+        break
+
+    counters[key] = number + 1
+    _save_counters(counter_path, counters)
+    return new_filename
+
+def release_filename(folder, filename):
+    """Remove a reserved file that was never written, e.g. after a failed render"""
+    path = os.path.join(folder, filename)
+    if os.path.exists(path) and os.path.getsize(path) == 0:
+        os.remove(path)
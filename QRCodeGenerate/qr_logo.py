@@ -0,0 +1,65 @@
+import os
+import functools
+from PIL import Image, ImageDraw, ImageOps
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Logos that can be placed in the middle of a code
+LOGOS = {
+    "None": None,
+    "Discord": "Discord-Logo.png",
+    "Discord Icon": "discord-black-icon-1.png",
+    "Globe": "3037366.png",
+}
+
+LOGO_SCALE = 0.22  # Logo width as a fraction of the code, small enough for error correction H
+LOGO_PADDING = 0.1  # Background margin around the logo, as a fraction of its size
+LOGO_MAX_SIZE = 1024  # Decoded logos are kept at most this big, no code needs more
+
+_decoded = {}  # path -> decoded RGBA logo, filled once per process
+
+def logo_path(logo):
+    """Resolve a LOGOS name (or a file path) to a file, None for no logo"""
+    if not logo or logo == "None":
+        return None
+    if logo in LOGOS:
+        return os.path.join(ASSET_DIR, LOGOS[logo])
+    return logo
+
+def load_logo(path):
+    """Decode a logo file once and keep it in memory"""
+    if path not in _decoded:
+        with Image.open(path) as img:
+            logo = img.convert("RGBA")
+        logo.thumbnail((LOGO_MAX_SIZE, LOGO_MAX_SIZE), Image.LANCZOS)
+        _decoded[path] = logo
+    return _decoded[path]
+
+def preload(decoded):
+    """Seed the decoded logos, e.g. in pool workers with logos decoded by the parent"""
+    _decoded.update(decoded)
+
+@functools.lru_cache(maxsize=64)
+def logo_for_size(path, size):
+    """Logo scaled to fit a size x size box, cached per (logo, size)"""
+    return ImageOps.contain(load_logo(path), (size, size), Image.LANCZOS)
+
+def overlay_logo(img, logo, bg_color=(255, 255, 255)):
+    """Alpha-composite a logo over the center of a code, on a background-colored pad.
+
+    bg_color is an RGB tuple, or None for a transparent pad.
+    """
+    path = logo_path(logo)
+    img = img.convert("RGBA")
+    if path is None:
+        return img
+    mark = logo_for_size(path, max(1, int(img.width * LOGO_SCALE)))
+    pad = int(max(mark.size) * LOGO_PADDING)
+    left = (img.width - mark.width) // 2
+    top = (img.height - mark.height) // 2
+
+    # Clear the modules behind the logo so they don't show through its transparent parts
+    fill = bg_color + (255,) if bg_color is not None else (0, 0, 0, 0)
+    ImageDraw.Draw(img).rectangle((left - pad, top - pad, left + mark.width + pad - 1, top + mark.height + pad - 1), fill=fill)
+    img.alpha_composite(mark, (left, top))
+    return img
@@ -0,0 +1,118 @@
+import qrcode
+import functools
+import numpy as np
+from PIL import Image
+from qr_logo import logo_path, overlay_logo
+
+# Color mapping for dot colors
+COLOR_MAP = {
+    "black": (0, 0, 0),
+    "yellow": (255, 255, 0),
+    "blue": (0, 0, 255),
+    "green": (0, 255, 0),
+    "red": (255, 0, 0),
+}
+
+STYLES = ["Square", "Rounded Dots", "Separate Squares"]
+
+@functools.lru_cache(maxsize=256)
+def make_matrix(website_url, border=4, error_correction=qrcode.constants.ERROR_CORRECT_L):
+    """QR module matrix (border included) as a 2D NumPy bool array, True = dark.
+
+    Memoized per (payload, border, error correction), so re-styling or
+    live-previewing the same payload skips the encoder. The returned array
+    is shared and read-only.
+    """
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=error_correction,
+        border=border,
+    )
+    qr.add_data(website_url)
+    qr.make(fit=True)
+    matrix = np.array(qr.get_matrix(), dtype=bool)
+    matrix.flags.writeable = False
+    return matrix
+
+@functools.lru_cache(maxsize=None)
+def make_stamp(style, box_size):
+    """Pixel mask (box_size x box_size) drawn for one dark module.
+
+    Cached per (style, box_size); colors are applied afterwards through the
+    image palette, so one stamp serves every color combination.
+    """
+    if style == "Rounded Dots":
+        # Circle touching the edges of the cell
+        center = (np.arange(box_size) + 0.5) - box_size / 2
+        stamp = center[:, None] ** 2 + center[None, :] ** 2 <= (box_size / 2) ** 2
+    else:
+        stamp = np.ones((box_size, box_size), dtype=bool)
+    if style == "Separate Squares":
+        # Leave a gap around each square so neighbours don't merge
+        gap = max(1, box_size // 10)
+        stamp[:gap, :] = stamp[-gap:, :] = False
+        stamp[:, :gap] = stamp[:, -gap:] = False
+    stamp.flags.writeable = False
+    return stamp
+
+def finder_mask(matrix, border=4):
+    """True on the three 7x7 finder patterns, which are always drawn as solid squares"""
+    mask = np.zeros_like(matrix)
+    size = len(matrix) - 2 * border
+    for row, col in ((0, 0), (0, size - 7), (size - 7, 0)):
+        mask[border + row:border + row + 7, border + col:border + col + 7] = True
+    return mask
+
+def render_mask(matrix, style="Square", box_size=10, border=4):
+    """Pixel mask for the whole code: every dark module stamped with the style's shape.
+
+    Each module becomes a (box_size x box_size) block through broadcasting,
+    so the cost is a few array ops regardless of the number of modules.
+    """
+    n = len(matrix)
+    stamp = make_stamp(style, box_size)
+    if style != "Square":
+        square = np.ones((box_size, box_size), dtype=bool)
+        finders = finder_mask(matrix, border)
+        blocks = np.where(finders[:, None, :, None], square[None, :, None, :], stamp[None, :, None, :])
+    else:
+        blocks = stamp[None, :, None, :]
+    return (matrix[:, None, :, None] & blocks).reshape(n * box_size, n * box_size)
+
+def colorize(mask, bg_color="white", dot_color="black"):
+    """Turn a pixel mask into the smallest image that holds it.
+
+    Black on white becomes a 1-bit image and any other pair a 2-color
+    palette image (both saved as 1-bit PNGs). RGBA is only used when the
+    background is "transparent".
+    """
+    dot_color_rgb = COLOR_MAP.get(dot_color, (0, 0, 0))  # Default to black if not found
+    if bg_color == "transparent":
+        pixels = np.zeros(mask.shape + (4,), dtype=np.uint8)
+        pixels[mask] = dot_color_rgb + (255,)
+        return Image.fromarray(pixels, "RGBA")
+
+    bg_color_rgb = COLOR_MAP.get(bg_color, (255, 255, 255))  # Default to white if not found
+    if dot_color_rgb == (0, 0, 0) and bg_color_rgb == (255, 255, 255):
+        return Image.fromarray(~mask)
+    img = Image.fromarray(mask.view(np.uint8), "P")
+    img.putpalette(bg_color_rgb + dot_color_rgb)
+    return img
+
+def make_qr_image(website_url, bg_color="white", dot_color="black", style="Square", box_size=10, border=4, logo=None):
+    """Build a styled QR code image (shared by test.py and batchQRCode.py).
+
+    With a logo (a qr_logo.LOGOS name or file path) the code is encoded with
+    error correction H so it still scans with its center covered, and the
+    result is RGBA.
+    """
+    error_correction = qrcode.constants.ERROR_CORRECT_L
+    if logo_path(logo) is not None:
+        error_correction = qrcode.constants.ERROR_CORRECT_H
+    matrix = make_matrix(website_url, border, error_correction)
+    mask = render_mask(matrix, style, box_size, border)
+    img = colorize(mask, bg_color, dot_color)
+    if error_correction == qrcode.constants.ERROR_CORRECT_H:
+        pad_color = None if bg_color == "transparent" else COLOR_MAP.get(bg_color, (255, 255, 255))
+        img = overlay_logo(img, logo, pad_color)
+    return img
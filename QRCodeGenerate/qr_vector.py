@@ -0,0 +1,151 @@
+import argparse
+import numpy as np
+from qr_style import COLOR_MAP, STYLES, make_matrix, finder_mask
+
+OUTPUT_FORMATS = {"PNG": ".png", "SVG": ".svg", "PDF": ".pdf"}  # SVG and PDF are drawn as vectors by this module
+
+KAPPA = 0.5523  # Bezier control distance for a quarter circle (PDF has no arcs)
+
+def merge_runs(mask):
+    """Cover the True cells of mask with as few rectangles as runs allow.
+
+    Each row is split into horizontal runs, then runs with the same x and
+    width in consecutive rows are stacked into one rectangle. Returns
+    (x, y, w, h) tuples in module units.
+    """
+    done = []
+    open_rects = {}  # (x, w) -> [x, y, w, h] still growing downwards
+    for y, row in enumerate(mask):
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], row.view(np.int8), [0]))))
+        runs = set(zip(edges[::2].tolist(), (edges[1::2] - edges[::2]).tolist()))
+        for key in list(open_rects):
+            if key not in runs:
+                done.append(tuple(open_rects.pop(key)))
+        for x, w in sorted(runs):
+            if (x, w) in open_rects:
+                open_rects[(x, w)][3] += 1
+            else:
+                open_rects[(x, w)] = [x, y, w, 1]
+    done.extend(tuple(rect) for rect in open_rects.values())
+    return done
+
+def cell_rects(mask, merge):
+    if merge:
+        return merge_runs(mask)
+    ys, xs = np.nonzero(mask)
+    return [(x, y, 1, 1) for y, x in zip(ys.tolist(), xs.tolist())]
+
+def module_shapes(matrix, style="Square", border=4, merge=True):
+    """Dark modules as vector shapes in module units.
+
+    Returns (rects, circles): rects as (x, y, w, h) and circles as
+    (cx, cy, r). Like the raster renderer, finder patterns are always solid
+    squares. With merge, touching square modules are combined into larger
+    rectangles (see merge_runs); circles and separate squares stay one shape
+    per module since they must not touch.
+    """
+    if style == "Square":
+        return cell_rects(matrix, merge), []
+
+    finders = finder_mask(matrix, border)
+    rects = cell_rects(matrix & finders, merge)
+    ys, xs = np.nonzero(matrix & ~finders)
+    if style == "Rounded Dots":
+        return rects, [(x + 0.5, y + 0.5, 0.5) for y, x in zip(ys.tolist(), xs.tolist())]
+    gap = 0.1  # Same gap as the raster "Separate Squares" stamp
+    return rects + [(x + gap, y + gap, 1 - 2 * gap, 1 - 2 * gap) for y, x in zip(ys.tolist(), xs.tolist())], []
+
+def hex_color(name, default):
+    return "#%02x%02x%02x" % COLOR_MAP.get(name, default)
+
+def svg_path(rects, circles):
+    """One SVG path "d" string holding every shape as a subpath"""
+    parts = [f"M{x:g} {y:g}h{w:g}v{h:g}h{-w:g}z" for x, y, w, h in rects]
+    parts += [f"M{cx - r:g} {cy:g}a{r:g} {r:g} 0 1 0 {2 * r:g} 0a{r:g} {r:g} 0 1 0 {-2 * r:g} 0z" for cx, cy, r in circles]
+    return "".join(parts)
+
+def svg_document(matrix, bg_color="white", dot_color="black", style="Square", box_size=10, border=4, shapes=None):
+    """SVG text for one code; the viewBox is in modules and box_size sets the display size"""
+    n = len(matrix)
+    rects, circles = shapes if shapes is not None else module_shapes(matrix, style, border)
+    lines = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{n * box_size}" height="{n * box_size}" viewBox="0 0 {n} {n}" shape-rendering="crispEdges">',
+    ]
+    if bg_color != "transparent":
+        lines.append(f'<rect width="{n}" height="{n}" fill="{hex_color(bg_color, (255, 255, 255))}"/>')
+    lines.append(f'<path fill="{hex_color(dot_color, (0, 0, 0))}" d="{svg_path(rects, circles)}"/>')
+    lines.append("</svg>")
+    return "\n".join(lines) + "\n"
+
+def save_svg(website_url, path, bg_color="white", dot_color="black", style="Square", box_size=10, border=4):
+    matrix = make_matrix(website_url, border)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(svg_document(matrix, bg_color, dot_color, style, box_size, border))
+
+def pdf_color(name, default):
+    return " ".join(f"{c / 255:g}" for c in COLOR_MAP.get(name, default))
+
+def pdf_content(matrix, bg_color="white", dot_color="black", style="Square", box_size=10, border=4, shapes=None):
+    """PDF content stream for one page, drawn in module units (y pointing down)"""
+    n = len(matrix)
+    rects, circles = shapes if shapes is not None else module_shapes(matrix, style, border)
+    ops = [f"{box_size} 0 0 {-box_size} 0 {n * box_size} cm"]
+    if bg_color != "transparent":
+        ops.append(f"{pdf_color(bg_color, (255, 255, 255))} rg 0 0 {n} {n} re f")
+    ops.append(f"{pdf_color(dot_color, (0, 0, 0))} rg")
+    ops += [f"{x:g} {y:g} {w:g} {h:g} re" for x, y, w, h in rects]
+    for cx, cy, r in circles:
+        k = r * KAPPA
+        ops.append(
+            f"{cx + r:g} {cy:g} m "
+            f"{cx + r:g} {cy + k:g} {cx + k:g} {cy + r:g} {cx:g} {cy + r:g} c "
+            f"{cx - k:g} {cy + r:g} {cx - r:g} {cy + k:g} {cx - r:g} {cy:g} c "
+            f"{cx - r:g} {cy - k:g} {cx - k:g} {cy - r:g} {cx:g} {cy - r:g} c "
+            f"{cx + k:g} {cy - r:g} {cx + r:g} {cy - k:g} {cx + r:g} {cy:g} c h"
+        )
+    ops.append("f")
+    return "\n".join(ops).encode("ascii"), n * box_size
+
+def pdf_document(pages):
+    """Multi-page PDF bytes from (content, page_size) pairs, one code per page"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None]
+    kids = []
+    for content, size in pages:
+        page_num = len(objects) + 1
+        kids.append(f"{page_num} 0 R")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {size} {size}] /Contents {page_num + 1} 0 R >>".encode("ascii"))
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode("ascii")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+def save_pdf(website_urls, path, bg_color="white", dot_color="black", style="Square", box_size=10, border=4):
+    """Write one page per URL into a single PDF"""
+    pages = [pdf_content(make_matrix(url, border), bg_color, dot_color, style, box_size, border) for url in website_urls]
+    with open(path, "wb") as f:
+        f.write(pdf_document(pages))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Save QR codes as SVG (one URL) or multi-page PDF (one page per URL)")
+    parser.add_argument("output", help="Output file, .svg or .pdf")
+    parser.add_argument("urls", nargs="+", help="URL(s) to encode")
+    parser.add_argument("--bg-color", default="white", help="Background color, or transparent")
+    parser.add_argument("--dot-color", default="black", help="Dot color")
+    parser.add_argument("--style", default="Square", choices=STYLES, help="Module style")
+    parser.add_argument("--box-size", type=int, default=10, help="Size of one module")
+    args = parser.parse_args()
+
+    if args.output.lower().endswith(".pdf"):
+        save_pdf(args.urls, args.output, args.bg_color, args.dot_color, args.style, args.box_size)
+    else:
+        save_svg(args.urls[0], args.output, args.bg_color, args.dot_color, args.style, args.box_size)
+    print(f"QR code saved as: {args.output}")
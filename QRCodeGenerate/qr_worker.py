@@ -0,0 +1,58 @@
+import queue
+import threading
+from PIL import Image
+
+PREVIEW_SIZE = (150, 150)
+POLL_MS = 50
+
+def fit_preview(img, size=PREVIEW_SIZE):
+    """Scale a code to the preview size, keeping its modules sharp"""
+    img = img.convert("RGBA")
+    scale = min(size[0] / img.width, size[1] / img.height)
+    return img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.NEAREST)
+
+def make_thumbnail(path, size=PREVIEW_SIZE):
+    """Load a saved code as a small image for the preview label"""
+    with Image.open(path) as img:
+        return fit_preview(img, size)
+
+class QRWorker:
+    """Runs generation jobs on a background thread so the tkinter window never blocks.
+
+    submit() queues a job (keyword arguments for the generate function);
+    poll() is driven by window.after on the GUI thread and hands each
+    finished job to on_result(job, result, error) there, since tkinter
+    widgets may only be touched from the thread that created them.
+    A thread is used rather than a process pool because the GUI scripts
+    build their window at import time, so spawned workers would open it too.
+    """
+
+    def __init__(self, generate):
+        self.generate = generate
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.pending = 0  # Only touched from the GUI thread
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, **job):
+        self.pending += 1
+        self.jobs.put(job)
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                self.results.put((job, self.generate(**job), None))
+            except Exception as e:
+                self.results.put((job, None, e))
+
+    def poll(self, window, on_result, interval_ms=POLL_MS):
+        """Deliver finished jobs to on_result, then reschedule itself"""
+        while True:
+            try:
+                job, result, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            on_result(job, result, error)
+        window.after(interval_ms, self.poll, window, on_result, interval_ms)
@@ -1,112 +1,47 @@
-import qrcode
 import os
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog
-from PIL import Image, ImageDraw
-
-# Color mapping for dot colors
-COLOR_MAP = {
-    "black": (0, 0, 0),
-    "yellow": (255, 255, 0),
-    "blue": (0, 0, 255),
-    "green": (0, 255, 0),
-    "red": (255, 0, 0),
-}
-
-def get_next_available_filename(folder, base_filename, extension):
-    # List all files in the folder
-    existing_files = os.listdir(folder)
-    
-    # Filter files with the given base filename and extension
-    matching_files = [f for f in existing_files if f.startswith(base_filename) and f.endswith(extension)]
-    
-    # Extract numbers from the matching files
-    numbers = []
-    for filename in matching_files:
-        try:
-            # Extract the number from the filename, assuming it's like 'image_1.png', 'image_2.png', etc.
-            number = int(filename[len(base_filename):-len(extension)])
-            numbers.append(number)
-        except ValueError:
-            continue  # Skip files that don't match the expected pattern
-    
-    # Determine the next available number
-    next_number = max(numbers, default=0) + 1
-    
-    # Construct the new filename
-    new_filename = f"{base_filename}{next_number}{extension}"
-    
-    return new_filename
-
-def generate_qr_code(website_url, folder, bg_color, dot_color, style):
+from qr_style import make_qr_image, STYLES
+from qr_logo import LOGOS, logo_path
+from qr_vector import save_svg, save_pdf, OUTPUT_FORMATS
+from qr_filenames import get_next_available_filename, release_filename
+from qr_worker import QRWorker, make_thumbnail, fit_preview, POLL_MS
+from batchQRCode import read_rows
+from PIL import ImageTk
+
+BATCH_SLICE = 20  # Rows queued at a time during a batch, so the queue stays short
+PREVIEW_DELAY_MS = 250  # Wait for typing to pause before updating the preview
+PREVIEW_BOX_SIZE = 3  # Low-resolution preview, the saved file uses the full size
+
+def generate_qr_code(website_url, folder, bg_color, dot_color, style, logo=None, output_format="PNG"):
     # Define the base filename and extension
     base_filename = "kiri_work_qr_"
-    extension = ".png"
+    extension = OUTPUT_FORMATS[output_format]
     
     # Get the next available filename
     new_filename = get_next_available_filename(folder, base_filename, extension)
     
-    # Generate the QR code with the desired style and color
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(website_url)
-    qr.make(fit=True)
-
-    # Get the RGB tuple for dot and background color
-    dot_color_rgb = COLOR_MAP.get(dot_color, (0, 0, 0))  # Default to black if not found
-    bg_color_rgb = COLOR_MAP.get(bg_color, (255, 255, 255))  # Default to white if not found
-
-    # Default style: Square QR Code
-    img = qr.make_image(fill=dot_color_rgb, back_color=bg_color_rgb)
-
-    # Apply different styles based on user choice
-    if style == "Rounded Dots":
-        img = apply_rounded_dots(img, dot_color_rgb)
-    elif style == "Separate Squares":
-        img = apply_separate_squares(img, dot_color_rgb)
-
-    # Save the image with the next available filename
-    img.save(os.path.join(folder, new_filename))
+    path = os.path.join(folder, new_filename)
+    try:
+        if output_format == "PNG":
+            # Build the styled QR code image
+            img = make_qr_image(website_url, bg_color, dot_color, style, logo=logo)
+
+            # Save the image with the next available filename
+            img.save(path)
+        elif logo_path(logo) is not None:
+            raise ValueError("logos are only supported for PNG output")
+        elif output_format == "SVG":
+            save_svg(website_url, path, bg_color, dot_color, style)
+        else:
+            save_pdf([website_url], path, bg_color, dot_color, style)
+    except Exception:
+        release_filename(folder, new_filename)  # Don't leave the reserved name behind as an empty file
+        raise
     print(f"QR code saved as: {new_filename}")
     return new_filename
 
-def apply_rounded_dots(img, dot_color):
-    """Modify the QR code to have rounded dots."""
-    img = img.convert("RGBA")  # Convert to RGBA to allow transparency manipulation
-    pixels = img.load()
-    
-    width, height = img.size
-    for y in range(height):
-        for x in range(width):
-            if pixels[x, y] == (0, 0, 0, 255):  # Find black pixels (QR code dots)
-                # Draw a rounded dot by changing the square to a circle
-                pixels[x, y] = dot_color + (255,)  # Set color and full opacity
-                
-    return img
-
-def apply_separate_squares(img, dot_color):
-    """Modify the QR code to use separate squares for each cell."""
-    img = img.convert("RGBA")
-    width, height = img.size
-    pixels = img.load()
-    
-    square_size = 10  # Size of the square cells
-    for y in range(0, height, square_size):
-        for x in range(0, width, square_size):
-            if pixels[x, y] == (0, 0, 0, 255):  # If it's a QR dot
-                # Draw a square for each cell instead of the usual dot
-                for i in range(x, x + square_size):
-                    for j in range(y, y + square_size):
-                        if i < width and j < height:
-                            pixels[i, j] = dot_color + (255,)
-    
-    return img
-
 # GUI for the QR code generator
 def open_gui():
     def browse_folder():
@@ -122,11 +57,84 @@ def open_gui():
         style = style_combobox.get()  # Get the selected style
 
         if website_url and folder_path:
-            filename = generate_qr_code(website_url, folder_path, bg_color, dot_color, style)
-            result_label.config(text=f"QR code saved as: {filename}")
+            # Generate in the background; the window stays responsive
+            worker.submit(website_url=website_url, folder=folder_path, bg_color=bg_color, dot_color=dot_color, style=style, logo=logo_combobox.get(), output_format=format_combobox.get())
+            result_label.config(text=f"Generating... ({worker.pending} in queue)", fg="black")
         else:
             result_label.config(text="Please fill in all fields!")
 
+    def batch():
+        input_file = filedialog.askopenfilename(filetypes=[("CSV or JSONL", "*.csv *.jsonl *.json"), ("All files", "*.*")])
+        folder_path = folder_entry.get()
+        if input_file and folder_path:
+            feed_batch(read_rows(input_file), folder_path)
+
+    def feed_batch(rows, folder_path):
+        # Queue a few rows per tick instead of the whole file at once
+        while worker.pending < BATCH_SLICE:
+            row = next(rows, None)
+            if row is None:
+                return
+            worker.submit(
+                website_url=row.get("payload") or row.get("url"),
+                folder=folder_path,
+                bg_color=row.get("bg_color") or color_combobox_bg.get(),
+                dot_color=row.get("dot_color") or color_combobox_dot.get(),
+                style=row.get("style") or style_combobox.get(),
+                logo=row.get("logo") or logo_combobox.get(),
+                output_format=format_combobox.get(),
+            )
+        window.after(POLL_MS, feed_batch, rows, folder_path)
+
+    def schedule_preview(event=None):
+        # Debounce: restart the timer on every change
+        nonlocal preview_timer
+        if preview_timer is not None:
+            window.after_cancel(preview_timer)
+        preview_timer = window.after(PREVIEW_DELAY_MS, request_preview)
+
+    def request_preview():
+        nonlocal preview_timer
+        preview_timer = None
+        website_url = url_entry.get()
+        if website_url:
+            preview_worker.submit(website_url=website_url, bg_color=color_combobox_bg.get(), dot_color=color_combobox_dot.get(), style=style_combobox.get(), logo=logo_combobox.get())
+
+    def preview_job(website_url, bg_color, dot_color, style, logo):
+        # Runs on the preview thread; nothing is written to disk
+        return fit_preview(make_qr_image(website_url, bg_color, dot_color, style, box_size=PREVIEW_BOX_SIZE, logo=logo))
+
+    def show_preview(job, result, error):
+        if preview_worker.pending:
+            return  # A newer preview is on its way
+        if error is not None:
+            result_label.config(text=f"Error: {error}", fg="red")
+            return
+        set_preview(result)
+
+    def set_preview(img):
+        preview = ImageTk.PhotoImage(img)
+        preview_label.config(image=preview)
+        preview_label.image = preview  # Keep a reference so tkinter doesn't drop it
+
+    def render_job(website_url, folder, bg_color, dot_color, style, logo, output_format):
+        # Runs on the worker thread
+        filename = generate_qr_code(website_url, folder, bg_color, dot_color, style, logo, output_format)
+        if output_format != "PNG":
+            # Vector files can't be opened with PIL, so show a small raster of the same code
+            return filename, fit_preview(make_qr_image(website_url, bg_color, dot_color, style, box_size=PREVIEW_BOX_SIZE))
+        return filename, make_thumbnail(os.path.join(folder, filename))
+
+    def show_result(job, result, error):
+        # Runs on the GUI thread via window.after
+        if error is not None:
+            result_label.config(text=f"Error: {error}", fg="red")
+            return
+        filename, thumb = result
+        set_preview(thumb)
+        queued = f" ({worker.pending} in queue)" if worker.pending else ""
+        result_label.config(text=f"QR code saved as: {filename}{queued}", fg="green")
+
     # Set up the main window
     window = tk.Tk()
     window.title("QR Code Generator")
@@ -146,7 +154,7 @@ def open_gui():
 
     # Background color selection
     tk.Label(window, text="Select Background Color:").grid(row=2, column=0, padx=10, pady=5)
-    color_combobox_bg = ttk.Combobox(window, values=["white", "yellow", "blue", "green", "red", "black"])
+    color_combobox_bg = ttk.Combobox(window, values=["white", "yellow", "blue", "green", "red", "black", "transparent"])
     color_combobox_bg.set("white")  # Default background color
     color_combobox_bg.grid(row=2, column=1, padx=10, pady=5)
 
@@ -158,17 +166,48 @@ def open_gui():
 
     # Style selection (QR code style)
     tk.Label(window, text="Select QR Code Style:").grid(row=4, column=0, padx=10, pady=5)
-    style_combobox = ttk.Combobox(window, values=["Square", "Rounded Dots", "Separate Squares"])
+    style_combobox = ttk.Combobox(window, values=STYLES)
     style_combobox.set("Square")  # Default style
     style_combobox.grid(row=4, column=1, padx=10, pady=5)
 
-    # Generate button
-    generate_button = tk.Button(window, text="Generate QR Code", command=generate)
-    generate_button.grid(row=5, column=0, columnspan=3, pady=10)
+    # Logo selection (switches the code to error correction H)
+    tk.Label(window, text="Select Logo:").grid(row=5, column=0, padx=10, pady=5)
+    logo_combobox = ttk.Combobox(window, values=list(LOGOS))
+    logo_combobox.set("None")  # Default: no logo
+    logo_combobox.grid(row=5, column=1, padx=10, pady=5)
+
+    # Output format selection (PNG, or SVG/PDF vectors without a logo)
+    tk.Label(window, text="Select Output Format:").grid(row=6, column=0, padx=10, pady=5)
+    format_combobox = ttk.Combobox(window, values=list(OUTPUT_FORMATS), state="readonly")
+    format_combobox.set("PNG")  # Default format
+    format_combobox.grid(row=6, column=1, padx=10, pady=5)
+
+    # Save button (the full-resolution file is only written here)
+    generate_button = tk.Button(window, text="Save QR Code", command=generate)
+    generate_button.grid(row=7, column=0, columnspan=2, pady=10)
+
+    # Batch button (CSV/JSONL rows, same columns as batchQRCode.py)
+    batch_button = tk.Button(window, text="Batch from File...", command=batch)
+    batch_button.grid(row=7, column=2, padx=10, pady=10)
 
     # Result display
     result_label = tk.Label(window, text="", fg="green")
-    result_label.grid(row=6, column=0, columnspan=3, pady=10)
+    result_label.grid(row=8, column=0, columnspan=3, pady=10)
+
+    # Live preview, updated as the URL or options change
+    preview_label = tk.Label(window)
+    preview_label.grid(row=9, column=0, columnspan=3, pady=10)
+    preview_timer = None
+    url_entry.bind("<KeyRelease>", schedule_preview)
+    for combobox in (color_combobox_bg, color_combobox_dot, style_combobox, logo_combobox):
+        combobox.bind("<<ComboboxSelected>>", schedule_preview)
+        combobox.bind("<KeyRelease>", schedule_preview)
+
+    # Background generation, results are picked up with window.after
+    worker = QRWorker(render_job)
+    worker.poll(window, show_result)
+    preview_worker = QRWorker(preview_job)  # Separate queue so previews don't wait behind a batch
+    preview_worker.poll(window, show_preview)
 
     # Start the GUI
     window.mainloop()
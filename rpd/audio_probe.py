@@ -0,0 +1,238 @@
+import os
+import json
+import struct
+import threading
+import subprocess
+
+INDEX_FILE = ".probe_index.json"  # Kept inside the folder it describes (e.g. cuts/)
+
+# ---- MP3 FRAME HEADER TABLES ----
+MPEG_VERSIONS = {0: 2.5, 2: 2, 3: 1}
+LAYERS = {1: 3, 2: 2, 3: 1}
+SAMPLE_RATES = {
+    1: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    2.5: [11025, 12000, 8000],
+}
+BITRATES = {  # kbps, index 1..14
+    (1, 1): [32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+def ffprobe_audio(path):
+    """Return {"sample_rate", "channels", "duration_ms"} of the first audio stream via ffprobe"""
+    result = subprocess.run([
+        "ffprobe", "-v", "error",
+        "-select_streams", "a:0",
+        "-show_entries", "stream=sample_rate,channels,duration:format=duration",
+        "-of", "json",
+        path
+    ], capture_output=True, text=True, check=True)
+    info = json.loads(result.stdout)
+    stream = info["streams"][0]
+    duration = stream.get("duration") or info.get("format", {}).get("duration") or 0
+    return {
+        "sample_rate": int(stream["sample_rate"]),
+        "channels": int(stream["channels"]),
+        "duration_ms": round(float(duration) * 1000),
+    }
+
+def parse_frame_header(data, pos):
+    """Decode the MPEG audio frame header at data[pos], or None if it isn't one"""
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    version = MPEG_VERSIONS.get((b1 >> 3) & 0x03)
+    layer = LAYERS.get((b1 >> 1) & 0x03)
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x03
+    if version is None or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    bitrate = BITRATES[(1 if version == 1 else 2, layer)][bitrate_index - 1] * 1000
+    padding = (b2 >> 1) & 0x01
+    channels = 1 if (b3 >> 6) == 3 else 2
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 576 if layer == 3 and version != 1 else 1152
+        length = samples // 8 * bitrate // sample_rate + padding
+    return {
+        "version": version,
+        "layer": layer,
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "samples": samples,
+        "length": length,
+    }
+
+def id3v2_size(data):
+    """Bytes taken by a leading ID3v2 tag (0 if there is none)"""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+def parse_mp3(path):
+    """Probe an mp3 from its frame headers, without decoding any audio.
+
+    Uses the Xing/Info frame count and the LAME encoder delay/padding when
+    present (ffmpeg writes both), so the duration matches what a decoder
+    outputs. Otherwise every frame header is walked. Returns None when the
+    file doesn't look like MPEG audio.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    pos = id3v2_size(data)
+    # Resync to the first real frame (allow a little junk after the tag)
+    limit = min(len(data), pos + 64 * 1024)
+    first = None
+    while pos < limit:
+        first = parse_frame_header(data, pos)
+        if first is not None and parse_frame_header(data, pos + first["length"]) is not None:
+            break
+        first = None
+        pos += 1
+    if first is None:
+        return None
+
+    # ---- Xing/Info tag in the first frame ----
+    if first["version"] == 1:
+        side_info = 17 if first["channels"] == 1 else 32
+    else:
+        side_info = 9 if first["channels"] == 1 else 17
+    tag = pos + 4 + side_info
+    samples = None
+    if data[tag:tag + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", data[tag + 4:tag + 8])[0]
+        cursor = tag + 8
+        frames = None
+        if flags & 0x1:
+            frames = struct.unpack(">I", data[cursor:cursor + 4])[0]
+            cursor += 4
+        if flags & 0x2:
+            cursor += 4
+        if flags & 0x4:
+            cursor += 100
+        if flags & 0x8:
+            cursor += 4
+        if frames is not None:
+            samples = frames * first["samples"]
+            # LAME tag: encoder delay / padding, 12 bits each, 21 bytes in.
+            # Other encoders leave the bytes after the Xing tag unset, so no tag = 0/0
+            delay_bytes = data[cursor + 21:cursor + 24]
+            if data[cursor:cursor + 4] in (b"LAME", b"Lavf", b"Lavc") and len(delay_bytes) == 3:
+                delay = (delay_bytes[0] << 4) | (delay_bytes[1] >> 4)
+                padding = ((delay_bytes[1] & 0x0F) << 8) | delay_bytes[2]
+                if delay + padding < samples:
+                    samples -= delay + padding
+
+    # ---- No usable tag: count frames ----
+    if samples is None:
+        samples = 0
+        while True:
+            header = parse_frame_header(data, pos)
+            if header is None:
+                break
+            samples += header["samples"]
+            pos += header["length"]
+
+    return {
+        "sample_rate": first["sample_rate"],
+        "channels": first["channels"],
+        "duration_ms": round(1000 * samples / first["sample_rate"]),
+    }
+
+def probe_audio(path):
+    """Sample rate, channel count and duration of path, from mp3 headers when possible"""
+    if path.lower().endswith(".mp3"):
+        info = parse_mp3(path)
+        if info is not None:
+            return info
+    return ffprobe_audio(path)
+
+def mix_format(probes):
+    """Output (rate, channels) the way pydub syncs segments: highest of each, at least 11025 Hz mono"""
+    rate = max([11025] + [p["sample_rate"] for p in probes])
+    channels = max([1] + [p["channels"] for p in probes])
+    return rate, channels
+
+def clip_start_times(countdown_ms, clip_ms, overlap_ms=1000):
+    """Start time (seconds) of each clip in countdown, clip, countdown, clip, ... order.
+
+    Same arithmetic as the pydub mix in editTogether.py: every countdown after
+    the first overlaps the end of the clip before it by overlap_ms.
+    """
+    timestamps = []
+    current_time_ms = countdown_ms
+    for i, duration_ms in enumerate(clip_ms):
+        timestamps.append(current_time_ms / 1000)
+        current_time_ms += duration_ms
+        if i < len(clip_ms) - 1:
+            current_time_ms += countdown_ms - overlap_ms
+    return timestamps
+
+class ProbeIndex:
+    """Probe results for the files in one folder, stored in folder/.probe_index.json.
+
+    Entries are keyed by file name and reused while the file's mtime and size
+    are unchanged, so building timestamps for a whole mix reads no audio.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.index_path = os.path.join(folder, INDEX_FILE)
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.index = {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError):
+                print(f"⚠️ Probe index {self.index_path} unreadable, rebuilding")
+
+    def _key(self, path):
+        folder = os.path.abspath(self.folder)
+        path = os.path.abspath(path)
+        if os.path.dirname(path) == folder:
+            return os.path.basename(path)
+        return path
+
+    def get(self, path):
+        """Probe info for path, probing (and remembering) it only if it changed"""
+        stat = os.stat(path)
+        key = self._key(path)
+        with self.lock:
+            entry = self.index.get(key)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                return entry["probe"]
+        probe = probe_audio(path)
+        with self.lock:
+            self.index[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "probe": probe}
+            self.dirty = True
+        return probe
+
+    def prune(self, keep):
+        """Forget folder entries whose file name is not in keep"""
+        with self.lock:
+            for key in [k for k in self.index if k not in keep and not os.path.isabs(k)]:
+                del self.index[key]
+                self.dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.index, f, indent=1, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+            self.dirty = False
@@ -1,14 +1,54 @@
 import os
+import json
+import hashlib
 import pandas as pd
 from yt_dlp import YoutubeDL
+from yt_dlp.utils import download_range_func
 import subprocess
 import tempfile
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from source_cache import SourceCache
+from audio_probe import ProbeIndex
 
 # ---- SETTINGS ----
 OUTPUT_DIR = "cuts"
 CSV_FILE = "songs.csv"  # Must include: Song, Artist, Link, Start, End
+FADE_IN_DUR = 2  # seconds
+FADE_OUT_DUR = 2  # seconds
+BITRATE = "192k"
+
+# ---- MANIFEST ----
+# cuts/.manifest.json records a hash of each row's Link/Start/End and the cut
+# settings. Only rows whose hash changed are re-cut, and clips whose row was
+# removed from the CSV are deleted.
+MANIFEST_FILE = os.path.join(OUTPUT_DIR, ".manifest.json")
+PRUNE_REMOVED = True
+
+# ---- CONCURRENCY ----
+PIPELINE = True  # Overlap downloads with ffmpeg encodes (False = one row at a time)
+DOWNLOAD_WORKERS = 4  # Parallel yt-dlp downloads
+ENCODE_WORKERS = os.cpu_count() or 1  # Parallel ffmpeg cuts
+
+# ---- RANGE FETCH ----
+RANGE_FETCH = True  # Download only [Start, End] instead of the whole track
+RANGE_MARGIN = 3  # Extra seconds fetched on each side of the cut
+
+# ---- SOURCE CACHE ----
+# Full downloads are kept in source_cache/ (shared with youtubedownload.py), so
+# re-cutting a row with new timestamps needs no network. Range fetches are
+# partial and never cached, so with RANGE_FETCH on, a row that is being re-cut
+# (its timestamps changed since the last run) is downloaded in full once and
+# cached; later re-cuts of it are then free. Set RANGE_FETCH = False to cache
+# every row on its first cut.
+USE_SOURCE_CACHE = True
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+source_cache = SourceCache() if USE_SOURCE_CACHE else None
+# Duration / sample rate / channels of every clip, read for editTogether.py
+probe_index = ProbeIndex(OUTPUT_DIR)
 
 # ---- READ CSV ----
 df = pd.read_csv(CSV_FILE)
@@ -34,8 +74,57 @@ def time_to_seconds(t: str):
     else:
         return parts[0]
 
-# ---- MAIN LOOP ----
-for _, row in df.iterrows():
+def load_manifest():
+    """Read the cut manifest ({filename: {"hash": ..., ...}})"""
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+    try:
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print(f"⚠️ Manifest {MANIFEST_FILE} unreadable, starting fresh")
+        return {}
+
+def save_manifest():
+    """Write the manifest atomically (callers hold manifest_lock)"""
+    tmp_path = MANIFEST_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+def row_hash(url, start, end):
+    """Hash everything that affects a clip's content"""
+    key = [url, time_to_seconds(start), time_to_seconds(end), FADE_IN_DUR, FADE_OUT_DUR, BITRATE]
+    return hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest()
+
+def record_clip(job):
+    """Mark job's clip as up to date in the manifest"""
+    with manifest_lock:
+        manifest[job["filename"]] = {
+            "hash": job["hash"],
+            "link": job["url"],
+            "start": job["start"],
+            "end": job["end"],
+        }
+        save_manifest()
+
+def prune_removed(csv_clips):
+    """Delete clips the manifest tracks but the CSV no longer lists"""
+    removed = [name for name in manifest if name not in csv_clips]
+    for name in removed:
+        clip_path = os.path.join(OUTPUT_DIR, name)
+        if os.path.exists(clip_path):
+            os.remove(clip_path)
+        del manifest[name]
+        print(f"🗑️ Removed clip no longer in {CSV_FILE}: {name}")
+    if removed:
+        save_manifest()
+
+def make_job(row, csv_clips):
+    """Turn a CSV row into a job dict, or None if it should be skipped.
+
+    Every clip filename the CSV lists is added to csv_clips.
+    """
     song = str(row.get("Song", "")).strip()
     artist = str(row.get("Artist", "")).strip()
     url = str(row.get("Link", "")).strip()
@@ -46,56 +135,242 @@ for _, row in df.iterrows():
     safe_artist = clean_filename(artist)
     filename = f"{safe_song} - {safe_artist}.mp3"
     clip_path = os.path.join(OUTPUT_DIR, filename)
+    csv_clips.add(filename)
 
     if not url or not start or not end:
         print(f"⚠️ Missing fields for: {song} - {artist}, skipped.\n")
-        continue
+        return None
 
+    try:
+        digest = row_hash(url, start, end)
+    except ValueError as e:
+        # A bad time only loses its own row, not the whole run
+        print(f"⚠️ Bad Start/End for: {song} - {artist} ({e}), skipped.\n")
+        return None
     if os.path.exists(clip_path):
-        print(f"✅ Already exists: {filename}")
-        continue
+        entry = manifest.get(filename)
+        if entry is None:
+            # Clip cut before the manifest existed: trust it and start tracking
+            record_clip({"filename": filename, "hash": digest, "url": url, "start": start, "end": end})
+            print(f"✅ Already exists: {filename}")
+            return None
+        if entry["hash"] == digest:
+            print(f"✅ Already exists: {filename}")
+            return None
+        print(f"🔁 Row changed, re-cutting: {filename}")
+        recut = True
+    else:
+        recut = False
+
+    return {
+        "song": song,
+        "artist": artist,
+        "url": url,
+        "start": start,
+        "end": end,
+        "filename": filename,
+        "clip_path": clip_path,
+        "hash": digest,
+        "recut": recut,
+    }
+
+def format_size(num_bytes):
+    """Human readable MB string"""
+    return f"{num_bytes / (1024 * 1024):.1f} MB"
+
+def fetch_audio(url, tmpdir, section=None):
+    """Download url into tmpdir, optionally only the (start, end) seconds in section.
+
+    Returns (path or None, yt-dlp info of the downloaded format).
+    """
+    temp_audio = os.path.join(tmpdir, "temp_audio.%(ext)s")
+    opts = base_opts.copy()
+    opts["outtmpl"] = temp_audio
+    if section:
+        opts["download_ranges"] = download_range_func(None, [section])
+
+    # ---- Download ----
+    with YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(url + "&no-playlist=1", download=True)
+    downloaded = (info.get("requested_downloads") or [info])[0]
+
+    # ---- Find file ----
+    downloaded_files = [os.path.join(tmpdir, f) for f in os.listdir(tmpdir)]
+    if not downloaded_files:
+        return None, downloaded
+    return downloaded_files[0], downloaded
+
+def download_source(job, tmpdir):
+    """Fetch the source audio into tmpdir.
+
+    Returns (path, offset) where offset is the source time in seconds the
+    file starts at (0 for a full download), or (None, 0) on failure.
+    """
+    if source_cache is not None:
+        cached = source_cache.get(job["url"], base_opts["format"])
+        if cached is not None:
+            print(f"💾 Cache hit {job['song']} - {job['artist']}: no download")
+            return cached, 0
+
+    started = time.perf_counter()
+    input_file, offset, info = None, None, {}
+    ranged = False
 
-    print(f"🎵 Processing: {song} - {artist} (fade-in/out, +1s end)")
+    # A row being re-cut is likely to be re-cut again: fetch it whole so it can be cached
+    if RANGE_FETCH and source_cache is not None and job["recut"]:
+        print(f"💾 Re-cut {job['song']} - {job['artist']}: downloading in full for the source cache")
+    elif RANGE_FETCH:
+        section = (
+            max(0, time_to_seconds(job["start"]) - RANGE_MARGIN),
+            time_to_seconds(job["end"]) + 1 + RANGE_MARGIN,
+        )
+        try:
+            input_file, info = fetch_audio(job["url"], tmpdir, section)
+            # yt-dlp only sets section_start when it really fetched a range
+            offset = info.get("section_start")
+            ranged = offset is not None
+        except Exception as e:
+            print(f"↩️ Range fetch failed for {job['song']} - {job['artist']}: {e}")
+        if input_file is None or not ranged:
+            print(f"↩️ Falling back to full download for {job['song']} - {job['artist']}")
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            os.makedirs(tmpdir, exist_ok=True)
+            input_file = None
+
+    if not ranged:
+        input_file, info = fetch_audio(job["url"], tmpdir)
+        offset = 0
+
+    if input_file is None:
+        print(f"❌ No file downloaded for {job['song']} - {job['artist']}")
+        return None, 0
+
+    # ---- Report bandwidth ----
+    elapsed = time.perf_counter() - started
+    fetched = os.path.getsize(input_file)
+    full_size = info.get("filesize") or info.get("filesize_approx")
+    if not ranged:
+        print(f"📦 Downloaded {job['song']} - {job['artist']}: {format_size(fetched)} in {elapsed:.1f}s")
+        if source_cache is not None:
+            input_file = source_cache.put(job["url"], base_opts["format"], input_file)
+    elif full_size:
+        saved = max(0, 1 - fetched / full_size) * 100
+        print(f"📉 Range fetch {job['song']} - {job['artist']}: {format_size(fetched)} of ~{format_size(full_size)} ({saved:.0f}% saved) in {elapsed:.1f}s")
+    else:
+        print(f"📉 Range fetch {job['song']} - {job['artist']}: {format_size(fetched)} in {elapsed:.1f}s")
+
+    return input_file, offset
+
+def cut_clip(job, input_file, offset=0):
+    """Cut [Start, End + 1s] out of input_file with fade-in/out and record it.
+
+    offset is the source time input_file starts at (non-zero for range fetches).
+    A failed cut removes the partial clip so it is never mistaken for a good one.
+    """
+    # ---- Compute time range ----
+    start_sec = time_to_seconds(job["start"])
+    end_sec = time_to_seconds(job["end"])
+    total_duration = end_sec - start_sec + 1  # +1s at end
+    fade_out_start = total_duration - FADE_OUT_DUR
+
+    # ---- Apply fade in/out ----
+    fade_filter = f"afade=t=in:st=0:d={FADE_IN_DUR},afade=t=out:st={fade_out_start}:d={FADE_OUT_DUR}"
+
+    try:
+        subprocess.run([
+            "ffmpeg", "-y",
+            "-ss", str(start_sec - offset), "-to", str(end_sec + 1 - offset),
+            "-i", input_file,
+            "-vn",
+            "-af", fade_filter,
+            "-acodec", "libmp3lame", "-ab", BITRATE,
+            job["clip_path"]
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, check=True)
+    except Exception:
+        if os.path.exists(job["clip_path"]):
+            os.remove(job["clip_path"])
+        raise
+    record_clip(job)
+    try:
+        probe_index.get(job["clip_path"])
+    except Exception as e:
+        # Not fatal: editTogether.py probes the clip itself when needed
+        print(f"⚠️ Could not probe {job['filename']}: {e}")
+
+def process_job(job):
+    """Download and cut one row in the current thread"""
+    print(f"🎵 Processing: {job['song']} - {job['artist']} (fade-in/out, +1s end)")
 
     try:
         with tempfile.TemporaryDirectory() as tmpdir:
-            temp_audio = os.path.join(tmpdir, "temp_audio.%(ext)s")
-            opts = base_opts.copy()
-            opts["outtmpl"] = temp_audio
-
-            # ---- Download ----
-            with YoutubeDL(opts) as ydl:
-                ydl.download([url + "&no-playlist=1"])
-
-            # ---- Find file ----
-            downloaded_files = [os.path.join(tmpdir, f) for f in os.listdir(tmpdir)]
-            if not downloaded_files:
-                print(f"❌ No file downloaded for {song} - {artist}")
-                continue
-            input_file = downloaded_files[0]
-
-            # ---- Compute time range ----
-            start_sec = time_to_seconds(start)
-            end_sec = time_to_seconds(end)
-            total_duration = end_sec - start_sec + 1  # +1s at end
-            fade_in_dur = 2
-            fade_out_dur = 2
-            fade_out_start = total_duration - fade_out_dur
-
-            # ---- Apply fade in/out ----
-            fade_filter = f"afade=t=in:st=0:d={fade_in_dur},afade=t=out:st={fade_out_start}:d={fade_out_dur}"
-
-            subprocess.run([
-                "ffmpeg", "-y",
-                "-ss", start, "-to", str(end_sec + 1),
-                "-i", input_file,
-                "-vn",
-                "-af", fade_filter,
-                "-acodec", "libmp3lame", "-ab", "192k",
-                clip_path
-            ], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
-
-        print(f"✅ Saved clip: {filename}\n")
+            input_file, offset = download_source(job, tmpdir)
+            if input_file is None:
+                return
+            cut_clip(job, input_file, offset)
+
+        print(f"✅ Saved clip: {job['filename']}\n")
 
     except Exception as e:
-        print(f"❌ Failed to process {song} - {artist}: {e}\n")
+        print(f"❌ Failed to process {job['song']} - {job['artist']}: {e}\n")
+
+def run_pipeline(jobs):
+    """Run downloads and encodes as two overlapping worker pools.
+
+    Each finished download is handed straight to the encode pool, so the
+    network keeps working while ffmpeg runs. The semaphore caps how many
+    downloaded-but-not-yet-cut files sit on disk at once.
+    """
+    slots = threading.BoundedSemaphore(DOWNLOAD_WORKERS + ENCODE_WORKERS)
+
+    def encode_stage(job, tmpdir, input_file, offset):
+        try:
+            cut_clip(job, input_file, offset)
+            print(f"✅ Saved clip: {job['filename']}\n")
+        except Exception as e:
+            print(f"❌ Failed to process {job['song']} - {job['artist']}: {e}\n")
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            slots.release()
+
+    def download_stage(job):
+        slots.acquire()
+        tmpdir = tempfile.mkdtemp()
+        print(f"🎵 Processing: {job['song']} - {job['artist']} (fade-in/out, +1s end)")
+        try:
+            input_file, offset = download_source(job, tmpdir)
+        except Exception as e:
+            print(f"❌ Failed to process {job['song']} - {job['artist']}: {e}\n")
+            input_file = None
+        if input_file is None:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            slots.release()
+            return
+        encode_pool.submit(encode_stage, job, tmpdir, input_file, offset)
+
+    # The download pool is shut down first (inner context), so every encode
+    # has been submitted before the encode pool starts waiting.
+    with ThreadPoolExecutor(max_workers=ENCODE_WORKERS) as encode_pool:
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as download_pool:
+            for job in jobs:
+                download_pool.submit(download_stage, job)
+
+# ---- MAIN LOOP ----
+manifest = load_manifest()
+manifest_lock = threading.Lock()
+
+csv_clips = set()
+jobs = [job for job in (make_job(row, csv_clips) for _, row in df.iterrows()) if job is not None]
+if PRUNE_REMOVED:
+    prune_removed(csv_clips)
+
+started = time.perf_counter()
+if PIPELINE:
+    print(f"🚀 Pipeline: {len(jobs)} rows, {DOWNLOAD_WORKERS} download / {ENCODE_WORKERS} encode workers\n")
+    run_pipeline(jobs)
+else:
+    for job in jobs:
+        process_job(job)
+probe_index.save()
+if source_cache is not None:
+    source_cache.save()
+print(f"⏱️ Done in {time.perf_counter() - started:.1f}s")
@@ -1,21 +1,45 @@
 import os
 import random
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pydub import AudioSegment
+from stream_mix import mix_stream, decode_chunks, decode_to_file
+from ffmpeg_mix import mix_ffmpeg
+from audio_probe import ProbeIndex, clip_start_times
+from pcm_cache import PCMCache
 
 # --- 路径设置 ---
 CUTS_DIR = "cuts"
 COUNTDOWN_FILE = "Countdown.mp3"
 OUTPUT_FILE = "final_mix.mp3"
 TIMESTAMP_FILE = "timestamps.txt"
+OVERLAP_MS = 1000  # clip 和 countdown 重叠 1s
+
+# --- 合成方式 ---
+# "stream"：边解码边编码，内存只占几秒音频，适合很长的 mix
+# "ffmpeg"：一条 ffmpeg 命令（acrossfade/concat 滤镜）完成全部合成，Python 不碰 PCM；
+#           时间戳由探测到的时长计算
+# "pydub"：旧方式，整段 mix 放在内存里
+MIX_ENGINE = "stream"
+
+# --- 只生成时间戳 ---
+# True：不解码任何音频，只根据 cuts/.probe_index.json 里的时长（读 mp3 帧头得到）
+# 输出播放顺序和 timestamps.txt，不导出 mix
+TIMESTAMPS_ONLY = False
+
+# --- 解码缓存 ---
+# 每个 clip 解码后的 PCM 存在 pcm_cache/（按文件内容哈希，超过上限按 LRU 删除），
+# 换 RANDOM_SEED / FIXED_START / FIXED_END 重新合成时不用再解码 mp3。False = 不用缓存
+USE_PCM_CACHE = True
+
+# --- 并行解码（只用于 "pydub" 方式） ---
+# 同时跑几个 ffmpeg 进程把所有 clip 解码成 PCM 文件，再按顺序拼接；1 = 逐个解码
+DECODE_WORKERS = os.cpu_count() or 1
 
 # --- 随机种子（可改成任意整数，保持结果可复现） ---
 RANDOM_SEED = 42
 random.seed(RANDOM_SEED)
 
-# --- 读取 Countdown ---
-countdown = AudioSegment.from_file(COUNTDOWN_FILE)
-countdown = countdown.fade_in(1000)  # countdown 渐入 1 秒
-
 # --- 获取所有片段文件 ---
 files = [f for f in os.listdir(CUTS_DIR) if f.lower().endswith(".mp3")]
 
@@ -35,35 +59,105 @@ print("🎵 播放顺序:")
 for i, f in enumerate(play_order, 1):
     print(f"{i:02d}. {f}")
 
+# --- 时长索引（按 文件名+mtime+大小 缓存，只在文件变了时重新读帧头） ---
+probe_index = ProbeIndex(CUTS_DIR)
+probe_index.prune(set(files))
+pcm_cache = PCMCache() if USE_PCM_CACHE else None
+
+def load_clip(clip_path):
+    """读取一个 clip 为 AudioSegment（有缓存时直接读缓存的 PCM）"""
+    if pcm_cache is None:
+        return AudioSegment.from_file(clip_path)
+    info = probe_index.get(clip_path)
+    pcm = pcm_cache.load(clip_path, info["sample_rate"], info["channels"])
+    return AudioSegment(data=pcm.tobytes(), sample_width=2, frame_rate=info["sample_rate"], channels=info["channels"])
+
+def decode_all(paths, tmpdir):
+    """并行解码所有文件（保持顺序），返回每个文件的 (PCM 文件路径, 采样率, 声道数)
+
+    每个 ffmpeg 进程直接把 PCM 写到文件里，不在进程之间传 AudioSegment。
+    """
+    def decode_one(item):
+        i, path = item
+        info = probe_index.get(path)
+        rate, channels = info["sample_rate"], info["channels"]
+        if pcm_cache is not None:
+            return pcm_cache.pcm_file(path, rate, channels), rate, channels
+        out_path = os.path.join(tmpdir, f"{i:04d}.pcm")
+        decode_to_file(path, rate, channels, out_path)
+        return out_path, rate, channels
+
+    with ThreadPoolExecutor(max_workers=DECODE_WORKERS) as pool:
+        return list(pool.map(decode_one, enumerate(paths)))
+
+def read_pcm(pcm_path, rate, channels):
+    with open(pcm_path, "rb") as f:
+        return AudioSegment(data=f.read(), sample_width=2, frame_rate=rate, channels=channels)
+
 # --- 合成 ---
-final_audio = AudioSegment.silent(duration=0)
-timestamps = []
-current_time_ms = 0
-
-# 先加一个 countdown（前导）
-final_audio += countdown
-current_time_ms += len(countdown)
-
-for i, f in enumerate(play_order):
-    clip_path = os.path.join(CUTS_DIR, f)
-    clip = AudioSegment.from_file(clip_path)
-
-    # 记录 clip 的实际开始时间（不含 countdown）
-    timestamps.append((current_time_ms / 1000, f))
-
-    # 添加 clip
-    final_audio += clip
-    current_time_ms += len(clip)
-
-    # 如果不是最后一个 clip，添加 countdown（clip 和 countdown 重叠 1s）
-    if i < len(play_order) - 1:
-        overlap_ms = 1000
-        final_audio = final_audio.append(countdown, crossfade=overlap_ms)
-        current_time_ms += len(countdown) - overlap_ms
-
-# --- 导出 ---
-final_audio.export(OUTPUT_FILE, format="mp3")
-print(f"✅ Exported audio to {OUTPUT_FILE}")
+def mix_with_pydub(clip_paths):
+    """整段在内存里合成（旧方式），返回每个 clip 的开始时间（秒）"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if DECODE_WORKERS > 1:
+            decoded = decode_all([COUNTDOWN_FILE] + clip_paths, tmpdir)
+            load = lambda i, path: read_pcm(*decoded[i])
+        else:
+            load = lambda i, path: load_clip(path)
+        return assemble_pydub(clip_paths, load)
+
+def assemble_pydub(clip_paths, load):
+    """按顺序拼接；load(i, path) 返回第 i 个文件（0 = countdown）的 AudioSegment"""
+    # --- 读取 Countdown ---
+    countdown = load(0, COUNTDOWN_FILE)
+    countdown = countdown.fade_in(1000)  # countdown 渐入 1 秒
+
+    final_audio = AudioSegment.silent(duration=0)
+    timestamps = []
+    current_time_ms = 0
+
+    # 先加一个 countdown（前导）
+    final_audio += countdown
+    current_time_ms += len(countdown)
+
+    for i, clip_path in enumerate(clip_paths):
+        clip = load(i + 1, clip_path)
+
+        # 记录 clip 的实际开始时间（不含 countdown）
+        timestamps.append(current_time_ms / 1000)
+
+        # 添加 clip
+        final_audio += clip
+        current_time_ms += len(clip)
+
+        # 如果不是最后一个 clip，添加 countdown（clip 和 countdown 重叠 1s）
+        if i < len(clip_paths) - 1:
+            final_audio = final_audio.append(countdown, crossfade=OVERLAP_MS)
+            current_time_ms += len(countdown) - OVERLAP_MS
+
+    # --- 导出 ---
+    final_audio.export(OUTPUT_FILE, format="mp3")
+    return timestamps
+
+clip_paths = [os.path.join(CUTS_DIR, f) for f in play_order]
+if TIMESTAMPS_ONLY:
+    start_times = clip_start_times(
+        probe_index.get(COUNTDOWN_FILE)["duration_ms"],
+        [probe_index.get(p)["duration_ms"] for p in clip_paths],
+        OVERLAP_MS,
+    )
+elif MIX_ENGINE == "stream":
+    start_times = mix_stream(COUNTDOWN_FILE, clip_paths, OUTPUT_FILE, overlap_ms=OVERLAP_MS, probe=probe_index.get,
+                             decode=pcm_cache.chunks if pcm_cache else decode_chunks)
+elif MIX_ENGINE == "ffmpeg":
+    start_times = mix_ffmpeg(COUNTDOWN_FILE, clip_paths, OUTPUT_FILE, overlap_ms=OVERLAP_MS, probe=probe_index.get)
+else:
+    start_times = mix_with_pydub(clip_paths)
+probe_index.save()
+if pcm_cache is not None:
+    pcm_cache.save()
+timestamps = list(zip(start_times, play_order))
+if not TIMESTAMPS_ONLY:
+    print(f"✅ Exported audio to {OUTPUT_FILE}")
 
 # --- 导出时间戳 ---
 def format_time(seconds):
@@ -0,0 +1,58 @@
+import subprocess
+from audio_probe import probe_audio, mix_format, clip_start_times
+
+CHANNEL_LAYOUTS = {1: "mono", 2: "stereo"}
+
+def build_filtergraph(num_clips, rate, channels, overlap_ms=1000, fade_in_ms=1000):
+    """Filter graph for: countdown, clip 1, countdown, clip 2, ..., clip N.
+
+    Inputs are expected in that same play order (countdown at even indices,
+    clips at odd ones). The countdown is opened once per gap instead of being
+    asplit, because asplit feeding both acrossfade and concat stalls and
+    truncates the output. Every clip except the last is acrossfaded into the
+    countdown after it, then all pieces are concatenated. The acrossfade
+    curves are linear, like pydub's append.
+    """
+    layout = CHANNEL_LAYOUTS.get(channels, f"{channels}c")
+    fmt = f"aresample={rate},aformat=sample_fmts=s16:sample_rates={rate}:channel_layouts={layout}"
+    overlap = overlap_ms / 1000
+
+    graph = []
+    for k in range(max(1, num_clips)):
+        graph.append(f"[{2 * k}:a]{fmt},afade=t=in:st=0:d={fade_in_ms / 1000}[cd{k}]")
+    for k in range(1, num_clips + 1):
+        graph.append(f"[{2 * k - 1}:a]{fmt}[clip{k}]")
+
+    pieces = ["[cd0]"]
+    for k in range(1, num_clips):
+        graph.append(f"[clip{k}][cd{k}]acrossfade=d={overlap}:c1=tri:c2=tri[xf{k}]")
+        pieces.append(f"[xf{k}]")
+    if num_clips:
+        pieces.append(f"[clip{num_clips}]")
+    graph.append("".join(pieces) + f"concat=n={len(pieces)}:v=0:a=1[out]")
+    return ";".join(graph)
+
+def mix_ffmpeg(countdown_file, clip_paths, output_file, overlap_ms=1000, fade_in_ms=1000, probe=probe_audio):
+    """Render the whole mix with one ffmpeg process.
+
+    Returns the start time of every clip in seconds, computed from probed
+    durations with the same arithmetic as the pydub version.
+    """
+    countdown_probe = probe(countdown_file)
+    clip_probes = [probe(p) for p in clip_paths]
+    rate, channels = mix_format([countdown_probe] + clip_probes)
+
+    command = ["ffmpeg", "-y", "-v", "error", "-i", countdown_file]
+    for i, clip_path in enumerate(clip_paths):
+        command += ["-i", clip_path]
+        if i < len(clip_paths) - 1:
+            command += ["-i", countdown_file]
+    command += [
+        "-filter_complex", build_filtergraph(len(clip_paths), rate, channels, overlap_ms, fade_in_ms),
+        "-map", "[out]",
+        "-acodec", "libmp3lame",
+        output_file
+    ]
+    subprocess.run(command, check=True)
+
+    return clip_start_times(countdown_probe["duration_ms"], [p["duration_ms"] for p in clip_probes], overlap_ms)
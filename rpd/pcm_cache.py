@@ -0,0 +1,82 @@
+import os
+import hashlib
+import tempfile
+import numpy as np
+from source_cache import FileCache
+from stream_mix import decode_chunks, decode_to_file, CHUNK_MS
+
+# ---- SETTINGS ----
+CACHE_DIR = "pcm_cache"
+CACHE_MAX_BYTES = 8 * 1024 ** 3  # Raw PCM is ~10x the mp3 size
+
+def file_hash(path):
+    """Content hash of path, so renamed or re-cut clips are handled correctly"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class PCMCache(FileCache):
+    """Decoded clips stored as raw s16le PCM files, keyed by (file hash, rate, channels).
+
+    Hits are read through np.memmap, so re-mixing the same clips in a new
+    order skips mp3 decoding completely. Misses are decoded once by ffmpeg
+    and written to the cache while they are being used.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        super().__init__(cache_dir, max_bytes)
+
+    @staticmethod
+    def key(path, rate, channels):
+        return f"{file_hash(path)}-{rate}-{channels}"
+
+    def _open(self, cached, channels):
+        if os.path.getsize(cached) == 0:
+            return np.zeros((0, channels), dtype=np.int16)
+        return np.memmap(cached, dtype=np.int16, mode="r").reshape(-1, channels)
+
+    def _decode_into(self, key, path, rate, channels, chunk_ms):
+        """Decode path with ffmpeg, yielding chunks while writing them to the cache"""
+        fd, tmp_path = tempfile.mkstemp(suffix=".pcm", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in decode_chunks(path, rate, channels, chunk_ms):
+                    out.write(chunk.tobytes())
+                    yield chunk
+            self.put_entry(key, tmp_path, source=os.path.basename(path), rate=rate, channels=channels)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def chunks(self, path, rate, channels, chunk_ms=CHUNK_MS):
+        """Yield (frames, channels) int16 chunks of path, like stream_mix.decode_chunks"""
+        key = self.key(path, rate, channels)
+        cached = self.get_entry(key)
+        if cached is None:
+            yield from self._decode_into(key, path, rate, channels, chunk_ms)
+            return
+        pcm = self._open(cached, channels)
+        step = rate * chunk_ms // 1000
+        for start in range(0, len(pcm), step):
+            yield pcm[start:start + step]
+
+    def pcm_file(self, path, rate, channels):
+        """Path of the cached raw PCM of path, decoding it into the cache on a miss"""
+        key = self.key(path, rate, channels)
+        cached = self.get_entry(key)
+        if cached is None:
+            fd, tmp_path = tempfile.mkstemp(suffix=".pcm", dir=self.cache_dir)
+            os.close(fd)
+            try:
+                decode_to_file(path, rate, channels, tmp_path)
+                cached = self.put_entry(key, tmp_path, source=os.path.basename(path), rate=rate, channels=channels)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        return cached
+
+    def load(self, path, rate, channels):
+        """Whole clip as a read-only (frames, channels) int16 array"""
+        return self._open(self.pcm_file(path, rate, channels), channels)
@@ -0,0 +1,196 @@
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse, parse_qs
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+# ---- SETTINGS ----
+CACHE_DIR = "source_cache"  # Shared by downloadnEdit.py and youtubedownload.py
+CACHE_MAX_BYTES = 5 * 1024 ** 3  # 5 GB, least recently used sources are evicted first
+INDEX_FILE = "index.json"
+LOCK_FILE = "index.lock"  # flock'd while the index is rewritten, so concurrent runs don't drop each other's entries
+
+def video_id(url: str):
+    """Normalize a YouTube link to its video ID (falls back to a hash of the URL)"""
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if host.endswith("youtu.be"):
+        vid = parsed.path.lstrip("/").split("/")[0]
+    elif "youtube" in host:
+        vid = parse_qs(parsed.query).get("v", [""])[0]
+        if not vid:
+            parts = parsed.path.strip("/").split("/")
+            if len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+                vid = parts[1]
+    else:
+        vid = ""
+    if vid:
+        return vid
+    return "url-" + hashlib.sha1(url.strip().encode("utf-8")).hexdigest()[:16]
+
+class FileCache:
+    """Files kept in cache_dir with an index.json of size and last use per key.
+
+    The cache is trimmed to max_bytes in LRU order. Entries touched by the
+    current process are never evicted, so a file can't disappear while it
+    is being used.
+
+    Several processes can share the cache: every write re-reads the index
+    under a file lock and applies its change to that. Hits only update the
+    last use in memory; it is written with the next put or by save().
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+        self.lock_path = os.path.join(cache_dir, LOCK_FILE)
+        self.opened_at = time.time()
+        self.lock = threading.Lock()
+        self.touched = {}  # key -> last use not written to the index yet
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            print(f"⚠️ Cache index {self.index_path} unreadable, starting empty")
+            return {}
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the index across processes (no-op without fcntl)"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _update_index(self, change=None):
+        """Re-read the index, apply change(index) and this process's hits, and write it back.
+
+        Callers hold self.lock.
+        """
+        with self._file_lock():
+            index = self._load_index()
+            for key, last_used in self.touched.items():
+                if key in index:
+                    index[key]["last_used"] = max(index[key]["last_used"], last_used)
+            self.touched = {}
+            if change is not None:
+                change(index)
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, indent=1)
+            os.replace(tmp_path, self.index_path)
+            self.index = index
+
+    def get_entry(self, key):
+        """Return the cached file for key or None, marking it as recently used"""
+        with self.lock:
+            if key not in self.index:
+                # Another process may have added it since the index was read
+                self.index = self._load_index()
+            entry = self.index.get(key)
+            if entry is None:
+                return None
+            path = os.path.join(self.cache_dir, entry["file"])
+            if not os.path.exists(path):
+                self.touched.pop(key, None)
+                self._update_index(lambda index: index.pop(key, None))
+                return None
+            entry["last_used"] = self.touched[key] = time.time()
+            return path
+
+    def save(self):
+        """Write the last use of this run's hits to the index"""
+        with self.lock:
+            if self.touched:
+                self._update_index()
+
+    def put_entry(self, key, src_path, **meta):
+        """Move src_path into the cache under key and return its new location"""
+        ext = os.path.splitext(src_path)[1]
+        filename = f"{key}{ext}"
+        path = os.path.join(self.cache_dir, filename)
+        shutil.move(src_path, path)
+        entry = dict(
+            meta,
+            file=filename,
+            size=os.path.getsize(path),
+            last_used=time.time(),
+        )
+
+        def add(index):
+            index[key] = entry
+            self._evict(index)
+
+        with self.lock:
+            self._update_index(add)
+        return path
+
+    def _evict(self, index):
+        total = sum(entry["size"] for entry in index.values())
+        for key, entry in sorted(index.items(), key=lambda kv: kv[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if entry["last_used"] >= self.opened_at:
+                continue
+            try:
+                os.remove(os.path.join(self.cache_dir, entry["file"]))
+            except FileNotFoundError:
+                pass
+            total -= entry["size"]
+            del index[key]
+            print(f"🧹 Evicted from cache: {entry['file']}")
+
+class SourceCache(FileCache):
+    """Downloaded source audio, keyed by (video ID, yt-dlp format)"""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        super().__init__(cache_dir, max_bytes)
+
+    @staticmethod
+    def key(url, fmt):
+        return f"{video_id(url)}.{re.sub(r'[^A-Za-z0-9]+', '_', fmt).strip('_')}"
+
+    def get(self, url, fmt):
+        """Return the cached file for (url, fmt) or None"""
+        return self.get_entry(self.key(url, fmt))
+
+    def put(self, url, fmt, src_path):
+        """Move src_path into the cache and return its new location"""
+        return self.put_entry(self.key(url, fmt), src_path, url=url, format=fmt)
+
+    def fetch(self, url, fmt, download):
+        """Return the cached source for (url, fmt), calling download(tmpdir) on a miss.
+
+        download must save the file into tmpdir and return its path (or None).
+        """
+        path = self.get(url, fmt)
+        if path is not None:
+            print(f"💾 Cache hit: {os.path.basename(path)}")
+            return path
+        with tempfile.TemporaryDirectory(dir=self.cache_dir) as tmpdir:
+            downloaded = download(tmpdir)
+            if downloaded is None:
+                return None
+            return self.put(url, fmt, downloaded)
@@ -0,0 +1,219 @@
+import subprocess
+import numpy as np
+from audio_probe import probe_audio, mix_format
+
+# ---- SETTINGS ----
+CHUNK_MS = 500  # Decode/encode granularity, memory stays around a few of these
+SILENCE_DB = -120  # pydub fades to/from -120 dB, not true silence
+
+def decode_chunks(path, rate, channels, chunk_ms=CHUNK_MS):
+    """Yield int16 arrays of shape (frames, channels) decoded from path by ffmpeg"""
+    proc = subprocess.Popen([
+        "ffmpeg", "-v", "error",
+        "-i", path,
+        "-vn",
+        "-f", "s16le", "-acodec", "pcm_s16le",
+        "-ar", str(rate), "-ac", str(channels),
+        "-"
+    ], stdout=subprocess.PIPE)
+    chunk_bytes = rate * chunk_ms // 1000 * channels * 2
+    try:
+        while True:
+            data = proc.stdout.read(chunk_bytes)
+            if not data:
+                break
+            yield np.frombuffer(data, dtype=np.int16).reshape(-1, channels)
+    finally:
+        proc.stdout.close()
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed to decode {path}")
+
+def decode_to_file(path, rate, channels, out_path):
+    """Decode path to a raw s16le file with ffmpeg (no PCM passes through Python)"""
+    subprocess.run([
+        "ffmpeg", "-y", "-v", "error",
+        "-i", path,
+        "-vn",
+        "-f", "s16le", "-acodec", "pcm_s16le",
+        "-ar", str(rate), "-ac", str(channels),
+        out_path
+    ], check=True)
+
+def fade_gains(frames, rate, from_gain_db, to_gain_db):
+    """Per-frame amplitude gains matching pydub's fade (one linear step per ms)"""
+    from_power = 10 ** (from_gain_db / 20)
+    to_power = 10 ** (to_gain_db / 20)
+    duration_ms = max(1, round(1000 * frames / rate))
+    # pydub maps millisecond i to frames [int(i * rate / 1000), int((i + 1) * rate / 1000))
+    boundaries = (np.arange(duration_ms + 1) * (rate / 1000.0)).astype(np.int64)
+    ms_index = np.searchsorted(boundaries, np.arange(frames), side="right") - 1
+    return from_power + (to_power - from_power) / duration_ms * ms_index
+
+def apply_gain(pcm, gains):
+    """Scale int16 pcm by per-frame gains, flooring like audioop.mul"""
+    return np.floor(pcm.astype(np.float64) * gains[:, None]).astype(np.int64)
+
+def to_int16(samples):
+    return np.clip(samples, -32768, 32767).astype(np.int16)
+
+def ms_length(frames, rate):
+    """Same rounding as len(AudioSegment)"""
+    return round(1000 * frames / rate)
+
+def ms_frames(ms, rate):
+    """Frame index of a millisecond position, same as AudioSegment slicing"""
+    return int(ms * (rate / 1000.0))
+
+def fit_frames(pcm, frames):
+    """Cut pcm to frames, or pad it with silence like pydub slicing past the end"""
+    if len(pcm) >= frames:
+        return pcm[:frames]
+    return np.concatenate([pcm, np.zeros((frames - len(pcm), pcm.shape[1]), dtype=pcm.dtype)])
+
+class StreamMixer:
+    """Append audio streams into an mp3 encoder with bounded memory.
+
+    Only the overlap window of the previous stream is held back so the next
+    stream can be crossfaded over it; everything else is passed straight to
+    ffmpeg as it is decoded.
+
+    Crossfades are cut at whole milliseconds of the mix so far, like
+    AudioSegment.append, so the last frame or so before a crossfade can be
+    dropped or padded with silence exactly as pydub does.
+    """
+
+    def __init__(self, output_file, rate, channels):
+        self.rate = rate
+        self.channels = channels
+        self.tail = np.zeros((0, channels), dtype=np.int16)
+        self.emitted = 0
+        self.encoder = subprocess.Popen([
+            "ffmpeg", "-y", "-v", "error",
+            "-f", "s16le", "-ar", str(rate), "-ac", str(channels),
+            "-i", "-",
+            "-f", "mp3",
+            output_file
+        ], stdin=subprocess.PIPE)
+
+    def _emit(self, pcm):
+        self.encoder.stdin.write(pcm.tobytes())
+        self.emitted += len(pcm)
+
+    def add(self, chunks, crossfade_ms=0, hold_ms=0):
+        """Append a stream of chunks and return its length in frames.
+
+        crossfade_ms: overlap the start of this stream with the held-back tail.
+        hold_ms: keep the last hold_ms of the mix back for the next crossfade. This
+            can reach into the streams before this one (a clip shorter than the
+            overlap), so every stream that can be followed by a crossfade must
+            hold too.
+        """
+        # pydub's millisecond slices can reach a frame or two past hold_ms, keep 2 ms extra
+        hold = ms_frames(hold_ms + 2, self.rate) if hold_ms else 0
+        head_needed = ms_frames(crossfade_ms, self.rate) if crossfade_ms else 0
+        head = []
+        total = 0
+        if head_needed:
+            pending = np.zeros((0, self.channels), dtype=np.int16)
+        else:
+            # No crossfade requested: the held tail plays as-is
+            pending, self.tail = self.tail, self.tail[:0]
+
+        for chunk in chunks:
+            total += len(chunk)
+            if head_needed:
+                head.append(chunk)
+                buffered = sum(len(c) for c in head)
+                if buffered < head_needed:
+                    continue
+                chunk = np.concatenate(head)
+                chunk = np.concatenate([self._crossfade(chunk[:head_needed], crossfade_ms), chunk[head_needed:]])
+                head_needed = 0
+                head = []
+
+            pending = np.concatenate([pending, chunk])
+            if len(pending) > hold:
+                self._emit(pending[:len(pending) - hold])
+                pending = pending[len(pending) - hold:]
+
+        if head_needed:
+            # Stream shorter than the overlap window
+            pending = self._crossfade(np.concatenate([pending] + head), crossfade_ms)
+        self.tail = pending
+        return total
+
+    def _crossfade(self, head, crossfade_ms):
+        """Mix the held tail (fading out) with head (fading in), like AudioSegment.append"""
+        # AudioSegment.append takes the last crossfade_ms of the mix by whole milliseconds
+        # of its rounded length, so the window can end before or after the last frame
+        length_ms = ms_length(self.emitted + len(self.tail), self.rate)
+        cut = max(0, ms_frames(length_ms - crossfade_ms, self.rate) - self.emitted)
+        stop = ms_frames(length_ms, self.rate) - self.emitted
+        # The fade then runs over whole milliseconds of that window
+        frames = ms_frames(ms_length(stop - cut, self.rate), self.rate)
+        if cut:
+            self._emit(self.tail[:cut])
+        tail = fit_frames(self.tail[cut:stop][:frames], frames)
+
+        mixed = apply_gain(tail, fade_gains(frames, self.rate, 0, SILENCE_DB))
+        overlap = min(len(head), frames)
+        mixed[:overlap] += apply_gain(head, fade_gains(len(head), self.rate, SILENCE_DB, 0))[:overlap]
+        self.tail = self.tail[:0]
+        return to_int16(mixed)
+
+    def abort(self):
+        self.encoder.kill()
+        self.encoder.wait()
+
+    def close(self):
+        if len(self.tail):
+            self._emit(self.tail)
+        self.encoder.stdin.close()
+        if self.encoder.wait() != 0:
+            raise RuntimeError("ffmpeg failed to encode the mix")
+
+def mix_stream(countdown_file, clip_paths, output_file, overlap_ms=1000, fade_in_ms=1000,
+               probe=probe_audio, decode=decode_chunks):
+    """Countdown, then each clip with the countdown crossfaded in between.
+
+    decode(path, rate, channels) yields the PCM chunks of a file; pass a
+    cache's reader to skip ffmpeg for clips decoded before.
+
+    Returns the start time of every clip in seconds (same arithmetic as the
+    pydub version in editTogether.py).
+    """
+    rate, channels = mix_format([probe(p) for p in [countdown_file] + list(clip_paths)])
+
+    # The countdown is a few seconds long: decode it once and reuse it
+    countdown = np.concatenate(list(decode(countdown_file, rate, channels)))
+    # fade_in() rebuilds the countdown from whole-millisecond slices, so it ends
+    # at its rounded length: the last frame may be dropped or padded
+    countdown = fit_frames(countdown, ms_frames(ms_length(len(countdown), rate), rate))
+    fade_frames = min(len(countdown), ms_frames(fade_in_ms, rate))
+    faded = countdown.astype(np.int64)
+    faded[:fade_frames] = apply_gain(countdown[:fade_frames], fade_gains(fade_frames, rate, SILENCE_DB, 0))
+    countdown = to_int16(faded)
+    countdown_ms = ms_length(len(countdown), rate)
+
+    mixer = StreamMixer(output_file, rate, channels)
+    timestamps = []
+    current_time_ms = 0
+    try:
+        # Every stream before a crossfade holds the overlap back: a clip shorter
+        # than the overlap is crossfaded together with the end of the countdown
+        mixer.add([countdown], hold_ms=overlap_ms if len(clip_paths) > 1 else 0)
+        current_time_ms += countdown_ms
+
+        for i, clip_path in enumerate(clip_paths):
+            last = i == len(clip_paths) - 1
+            timestamps.append(current_time_ms / 1000)
+            frames = mixer.add(decode(clip_path, rate, channels), hold_ms=0 if last else overlap_ms)
+            current_time_ms += ms_length(frames, rate)
+            if not last:
+                mixer.add([countdown], crossfade_ms=overlap_ms, hold_ms=overlap_ms)
+                current_time_ms += countdown_ms - overlap_ms
+    except BaseException:
+        mixer.abort()
+        raise
+    mixer.close()
+    return timestamps
@@ -1,6 +1,8 @@
 import os
+import subprocess
 import pandas as pd
 from yt_dlp import YoutubeDL
+from source_cache import SourceCache
 
 # ---- SETTINGS ----
 OUTPUT_DIR = "downloads"
@@ -8,6 +10,11 @@ CSV_FILE = "songs.csv"  # Your CSV with columns: Song, Artist, Link
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Raw downloads live in source_cache/ (shared with downloadnEdit.py), the mp3
+# in downloads/ is converted from there, so a song already fetched by either
+# script is never downloaded again.
+source_cache = SourceCache()
+
 # ---- READ CSV ----
 df = pd.read_csv(CSV_FILE)
 
@@ -16,13 +23,15 @@ base_opts = {
     'format': 'bestaudio/best',
     'noplaylist': True,
     'quiet': False,
-    'postprocessors': [{
-        'key': 'FFmpegExtractAudio',
-        'preferredcodec': 'mp3',
-        'preferredquality': '192',
-    }],
 }
 
+def download_raw(ydl, url, tmpdir):
+    """Download the raw audio stream into tmpdir and return its path"""
+    ydl.params['outtmpl'] = os.path.join(tmpdir, "source.%(ext)s")
+    ydl.download([url + "&no-playlist=1"])
+    downloaded_files = [os.path.join(tmpdir, f) for f in os.listdir(tmpdir)]
+    return downloaded_files[0] if downloaded_files else None
+
 # ---- DOWNLOAD LOOP ----
 with YoutubeDL(base_opts) as ydl:
     for _, row in df.iterrows():
@@ -39,12 +48,23 @@ with YoutubeDL(base_opts) as ydl:
             print(f"✅ Already downloaded: {safe_name}.mp3")
             continue
 
-        # Customize output filename for this song
-        ydl.params['outtmpl'] = os.path.join(OUTPUT_DIR, f"{safe_name}.%(ext)s")
-
         print(f"🎵 Downloading: {safe_name}")
         try:
-            ydl.download([url + "&no-playlist=1"])
+            source = source_cache.fetch(url, base_opts['format'], lambda tmpdir: download_raw(ydl, url, tmpdir))
+            if source is None:
+                print(f"❌ No file downloaded for {url}\n")
+                continue
+
+            # Same conversion yt-dlp's FFmpegExtractAudio (mp3, 192k) used to do
+            subprocess.run([
+                "ffmpeg", "-y",
+                "-i", source,
+                "-vn",
+                "-acodec", "libmp3lame", "-ab", "192k",
+                target_path
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, check=True)
             print(f"✅ Finished: {safe_name}.mp3\n")
         except Exception as e:
             print(f"❌ Failed to download {url}: {e}\n")
+
+source_cache.save()